@@ -34,6 +34,8 @@ app.conf.beat_schedule = {
         }
     },
     
+    # The get_data cache is prewarmed by finalize_run when a run completes
+    
     # Clean up old forecasts weekly (every Sunday at 2:00 AM)
     'cleanup-old-forecasts': {
         'task': 'wrf_data.tasks.cleanup_old_forecasts',
@@ -59,6 +61,15 @@ app.conf.update(
     task_time_limit=3600,  # 1 hour hard limit
     task_soft_time_limit=3000,  # 50 minutes soft limit
     
+    # Ack after the task finishes so a killed worker's fetch is redelivered.
+    # Redelivery is safe: ForecastData rows are written with
+    # bulk_create(update_conflicts=True) on (run, domain, parameter, time_step),
+    # so a replayed process task overwrites its rows instead of duplicating them
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Redis redelivers unacked tasks after this - keep it above task_time_limit
+    broker_transport_options={'visibility_timeout': 7200},
+    
     # Worker settings
     worker_prefetch_multiplier=1,  # One task at a time
     worker_max_tasks_per_child=50,  # Restart worker after 50 tasks
@@ -178,6 +178,20 @@ WRF_CONFIG = {
 
     # Remote Path
     'REMOTE_BASE_PATH': env('WRF_REMOTE_GRIB_PATH', default='/home/nwp/DA/SEVERE'),
+    'DOWNLOAD_WORKERS': env.int('WRF_DOWNLOAD_WORKERS', default=8),  # Parallel SFTP channels
+    'SFTP_POOL_SIZE': env.int('WRF_SFTP_POOL_SIZE', default=None),  # Pooled SFTP sessions (None = DOWNLOAD_WORKERS)
+    'SFTP_REQUEST_SIZE': env.int('WRF_SFTP_REQUEST_SIZE', default=32768),  # 4096 for short-block servers
+    'SFTP_CHUNK_SIZE': env.int('WRF_SFTP_CHUNK_SIZE', default=1 << 20),  # Local copy buffer (1 MiB)
+    'SFTP_PREFETCH_DEPTH': env.int('WRF_SFTP_PREFETCH_DEPTH', default=64),  # Max in-flight READs per file
+    'SFTP_WINDOW_SIZE': env.int('WRF_SFTP_WINDOW_SIZE', default=8 << 20),  # Channel flow-control window (8 MiB)
+    'SFTP_MAX_PACKET_SIZE': env.int('WRF_SFTP_MAX_PACKET_SIZE', default=1 << 18),  # Channel max packet (256 KiB)
+    'SSH_COMPRESSION': env.bool('WRF_SSH_COMPRESSION', default=False),  # zlib transport compression
+    'CONNECTION_PERSIST': env.int('WRF_CONNECTION_PERSIST', default=7200),  # Idle seconds before reconnect
+    'LISTDIR_TTL': env.int('WRF_LISTDIR_TTL', default=60),  # Seconds to cache remote directory listings
+    'USE_TAR_STREAM': env.bool('WRF_USE_TAR_STREAM', default=True),  # Bulk download as one remote tar stream
+    'TRANSFER_BACKEND': env('WRF_TRANSFER_BACKEND', default='paramiko'),  # 'paramiko' or 'openssh' (native sftp)
+    'STREAM_MODE': env.bool('WRF_STREAM_MODE', default=False),  # Decode from memory instead of archiving to disk
+    'DECODE_WORKERS': env.int('WRF_DECODE_WORKERS', default=None),  # GRIB decode processes (None = CPU count)
 
     # Local paths - use temp directory (auto-cleaned)
     'LOCAL_DATA_PATH': TEMP_ROOT,
@@ -191,22 +205,36 @@ WRF_CONFIG = {
 }
 
 # ============================================
-# Cache Configuration (In-Memory)
+# Cache Configuration (Redis when available, else In-Memory)
 # ============================================
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'wrf-data-cache',
-        'TIMEOUT': 900,  # 15 minutes
-        'OPTIONS': {
-            'MAX_ENTRIES': 100  # Store up to 100 timesteps in memory
+REDIS_URL = env('REDIS_URL', default='')
+
+if REDIS_URL:
+    # Shared between web and Celery workers (live run progress lives here)
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 900,  # 15 minutes
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'wrf-data-cache',
+            'TIMEOUT': 900,  # 15 minutes
+            'OPTIONS': {
+                'MAX_ENTRIES': 100  # Store up to 100 timesteps in memory
+            }
         }
     }
-}
 
 # ============================================
-# Celery Configuration (DISABLED for on-demand mode)
+# Celery Configuration (optional - unset for on-demand mode)
 # ============================================
+# CELERY_RESULT_BACKEND is required with a broker: the fetch chord's
+# finalize/errback callbacks and fetch status polling both need it
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='')
 CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default='')
 
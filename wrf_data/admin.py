@@ -4,6 +4,7 @@ File: wrf_data/admin.py
 """
 
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.http import HttpResponse
 from .models import Domain, Parameter, ForecastRun, ForecastData, DataFetchLog
@@ -76,6 +77,10 @@ class ParameterAdmin(admin.ModelAdmin):
         ('Value Range', {
             'fields': ('min_value', 'max_value')
         }),
+        ('Storage Packing', {
+            'fields': ('pack_scale', 'pack_offset'),
+            'description': 'Grid values are stored as int16: value = q * scale + offset'
+        }),
         ('Color Scale', {
             'fields': ('color_scale',),
             'description': 'JSON array defining color mapping for visualization'
@@ -170,9 +175,14 @@ class ForecastRunAdmin(admin.ModelAdmin):
         )
     progress_bar.short_description = 'Progress'
 
+    def get_queryset(self, request):
+        # One COUNT per page instead of one query per row
+        return super().get_queryset(request).annotate(_data_count=Count('data'))
+
     def data_count(self, obj):
-        return obj.data.count()
+        return obj._data_count
     data_count.short_description = 'Data Points'
+    data_count.admin_order_field = '_data_count'
 
     actions = ['mark_as_failed', 'mark_as_pending']
 
@@ -13,6 +13,7 @@ from django.conf import settings
 from django.utils import timezone
 from datetime import datetime, timedelta
 from pathlib import Path
+import os
 import shutil
 import logging
 
@@ -21,6 +22,26 @@ from wrf_data.models import ForecastRun, ForecastData
 logger = logging.getLogger(__name__)
 
 
+def folder_usage(path):
+    """
+    Total size and file count under a folder in one scandir walk
+    
+    Returns:
+        Tuple of (size in bytes, file count)
+    """
+    size = count = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                sub_size, sub_count = folder_usage(entry.path)
+                size += sub_size
+                count += sub_count
+            elif entry.is_file(follow_symlinks=False):
+                size += entry.stat(follow_symlinks=False).st_size
+                count += 1
+    return size, count
+
+
 class Command(BaseCommand):
     help = 'Clean up old GRIB files and database records based on retention policy'
 
@@ -117,11 +138,11 @@ class Command(BaseCommand):
         total_size = 0
         total_files = 0
         
-        # Scan for old folders
-        for folder in raw_path.iterdir():
-            if not folder.is_dir():
-                continue
-            
+        # Scan for old folders (scandir: entry types come with the listing)
+        with os.scandir(raw_path) as entries:
+            folders = [Path(e.path) for e in entries if e.is_dir(follow_symlinks=False)]
+        
+        for folder in folders:
             folder_name = folder.name
             
             # Check if folder name is a valid date (YYYYMMDDHH)
@@ -132,10 +153,7 @@ class Command(BaseCommand):
                     
                     if folder_date < cutoff_date:
                         # Calculate folder size
-                        folder_size = sum(
-                            f.stat().st_size for f in folder.rglob('*') if f.is_file()
-                        )
-                        file_count = sum(1 for f in folder.rglob('*') if f.is_file())
+                        folder_size, file_count = folder_usage(folder)
                         
                         folders_to_delete.append({
                             'path': folder,
@@ -13,13 +13,19 @@ Usage:
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 from datetime import datetime, timedelta
 import logging
+import multiprocessing
+import os
 from pathlib import Path
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
 
 from wrf_data.models import Domain, Parameter, ForecastRun, ForecastData, DataFetchLog
-from wrf_data.utils.ssh_fetcher import create_fetcher_from_config
-from wrf_data.utils.grib_processor import GRIBProcessor
+from wrf_data.utils.ssh_fetcher import create_fetcher_from_config, GRIB_FILENAME_RE, SUFFIX_DOMAINS
+from wrf_data.utils.grib_processor import decode_grib_file
+from wrf_data.utils.color_mapper import get_mapper_for_parameter
 
 logger = logging.getLogger(__name__)
 
@@ -129,7 +135,7 @@ class Command(BaseCommand):
             forecast_run.status = 'fetching'
             forecast_run.progress = 0
             forecast_run.error_message = ''
-            forecast_run.save()
+            forecast_run.save(update_fields=['status', 'progress', 'error_message', 'updated_at'])
             self.stdout.write(f'Updating existing forecast run (ID: {forecast_run.id})\n')
         else:
             self.stdout.write(f'Created new forecast run (ID: {forecast_run.id})\n')
@@ -157,29 +163,40 @@ class Command(BaseCommand):
                     
                     # Show available runs
                     self.stdout.write('📋 Available runs on server (last 10):')
-                    runs = fetcher.list_available_runs()
-                    for i, run in enumerate(runs[:10], 1):
+                    runs = fetcher.list_available_runs(limit=10)
+                    for i, run in enumerate(runs, 1):
                         dt = datetime.strptime(run, '%Y%m%d%H')
                         self.stdout.write(f'  {i:2d}. {run} → {dt.strftime("%Y-%m-%d %H:%M")}')
                     
                     fetch_log.status = 'failed'
                     fetch_log.error_message = error_msg
                     fetch_log.completed_at = timezone.now()
-                    fetch_log.save()
+                    fetch_log.save(update_fields=['status', 'error_message', 'completed_at'])
                     
                     forecast_run.status = 'failed'
                     forecast_run.error_message = error_msg
-                    forecast_run.save()
+                    forecast_run.save(update_fields=['status', 'error_message', 'updated_at'])
                     
                     raise CommandError(error_msg)
                 
-                # Download GRIB files
-                self.stdout.write('📥 Downloading GRIB files...\n')
-                results = fetcher.download_forecast_run(
-                    run_date=run_date,
-                    domain=options['domain'],
-                    max_hours=options['max_hours']
-                )
+                # Download GRIB files (or, in stream mode, only resolve them -
+                # each file is read into memory when it is decoded)
+                stream_mode = settings.WRF_CONFIG.get('STREAM_MODE', False)
+                if stream_mode:
+                    self.stdout.write('📡 Streaming GRIB files (no local archive)...\n')
+                    results = self.resolve_stream_files(
+                        fetcher,
+                        run_date=run_date,
+                        domain=options['domain'],
+                        max_hours=options['max_hours']
+                    )
+                else:
+                    self.stdout.write('📥 Downloading GRIB files...\n')
+                    results = fetcher.download_forecast_run(
+                        run_date=run_date,
+                        domain=options['domain'],
+                        max_hours=options['max_hours']
+                    )
                 
                 # Update fetch log
                 fetch_log.files_requested = results['total']
@@ -187,7 +204,7 @@ class Command(BaseCommand):
                 fetch_log.completed_at = timezone.now()
                 
                 # Calculate total bytes
-                total_bytes = sum(
+                total_bytes = results.get('total_bytes') or sum(
                     Path(f).stat().st_size for f in results['success'] 
                     if Path(f).exists()
                 )
@@ -209,7 +226,10 @@ class Command(BaseCommand):
                     ))
                 
                 fetch_log.add_log(f"Downloaded {len(results['success'])}/{results['total']} files", 'info')
-                fetch_log.save()
+                fetch_log.save(update_fields=[
+                    'files_requested', 'files_downloaded', 'completed_at',
+                    'total_bytes', 'status', 'error_message',
+                ])
                 
                 # Update forecast run
                 forecast_run.progress = 50  # Files downloaded
@@ -219,7 +239,7 @@ class Command(BaseCommand):
                     'failed': results['failed'],
                     'total_bytes': total_bytes
                 }
-                forecast_run.save()
+                forecast_run.save(update_fields=['progress', 'files_downloaded', 'updated_at'])
                 
                 # Process GRIB files
                 if results['success']:
@@ -227,19 +247,25 @@ class Command(BaseCommand):
                     self.process_downloaded_files(
                         forecast_run=forecast_run,
                         file_list=results['success'],
-                        domain_filter=options['domain']
+                        domain_filter=options['domain'],
+                        fetcher=fetcher if stream_mode else None
                     )
                 
                 # Mark as completed
                 forecast_run.status = 'completed'
                 forecast_run.progress = 100
                 forecast_run.completed_at = timezone.now()
-                forecast_run.save()
+                forecast_run.save(update_fields=['status', 'progress', 'completed_at', 'updated_at'])
                 
                 self.stdout.write(self.style.SUCCESS('\n' + '=' * 70))
-                self.stdout.write(self.style.SUCCESS(
-                    f'✅ Fetch complete! Files saved to: data/raw/{results["run_folder"]}'
-                ))
+                if stream_mode:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ Fetch complete! Streamed run {results["run_folder"]} (not archived)'
+                    ))
+                else:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ Fetch complete! Files saved to: data/raw/{results["run_folder"]}'
+                    ))
                 self.stdout.write(self.style.SUCCESS('=' * 70 + '\n'))
                 
         except Exception as e:
@@ -250,11 +276,11 @@ class Command(BaseCommand):
             fetch_log.status = 'failed'
             fetch_log.error_message = error_msg
             fetch_log.completed_at = timezone.now()
-            fetch_log.save()
+            fetch_log.save(update_fields=['status', 'error_message', 'completed_at'])
             
             forecast_run.status = 'failed'
             forecast_run.error_message = error_msg
-            forecast_run.save()
+            forecast_run.save(update_fields=['status', 'error_message', 'updated_at'])
             
             raise CommandError(f'Fetch failed: {error_msg}')
     
@@ -322,69 +348,151 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f'Failed to get latest run: {e}')
     
-    def process_downloaded_files(self, forecast_run, file_list, domain_filter):
+    def resolve_stream_files(self, fetcher, run_date, domain, max_hours):
+        """
+        List the remote GRIB files of a run for stream mode
+        
+        Returns:
+            Dict shaped like download_forecast_run() results, with remote
+            paths in 'success'
+        """
+        grib_files = [
+            f for f in fetcher.list_grib_files(run_date, domain)
+            if f['hour'] <= max_hours
+        ]
+        return {
+            'success': [f['remote_path'] for f in grib_files],
+            'failed': [],
+            'total': len(grib_files),
+            'run_folder': fetcher.get_forecast_folder_name(run_date),
+            'total_bytes': sum(f['attr'].st_size or 0 for f in grib_files),
+        }
+    
+    def process_downloaded_files(self, forecast_run, file_list, domain_filter, fetcher=None):
         """
         Process all downloaded GRIB files
         
         Args:
             forecast_run: ForecastRun instance
-            file_list: List of local file paths
+            file_list: List of local file paths (remote paths when fetcher is given)
             domain_filter: 'kenya', 'east-africa', or 'both'
+            fetcher: Connected WRFDataFetcher to stream files from instead of
+                reading local copies
         """
         total_files = len(file_list)
         processed_count = 0
         failed_count = 0
         
         # Get active parameters from database
-        parameters = Parameter.objects.filter(is_active=True)
+        parameters = list(Parameter.objects.filter(is_active=True))
+        parameter_codes = [parameter.code for parameter in parameters]
+        domains = {domain.code: domain for domain in Domain.objects.filter(is_active=True)}
         
-        for i, grib_file in enumerate(file_list, 1):
+        # Resolve which files to process
+        jobs = []
+        for grib_file in file_list:
             file_path = Path(grib_file)
             filename = file_path.name
             
             # Parse filename: WRFPRS_d01.00 or WRFPRS_d02.15
-            try:
-                parts = filename.split('.')
-                if len(parts) != 2 or not parts[0].startswith('WRFPRS_d'):
-                    logger.warning(f"Skipping invalid filename: {filename}")
-                    continue
-                
-                domain_suffix = parts[0][-2:]  # '01' or '02'
-                hour = int(parts[1])           # 0, 1, 2, ..., 72
-                
-                # Determine domain
-                domain_code = 'kenya' if domain_suffix == '01' else 'east-africa'
-                
-                # Skip if not in domain filter
-                if domain_filter != 'both' and domain_filter != domain_code:
-                    continue
-                
-                # Get domain from database
+            match = GRIB_FILENAME_RE.fullmatch(filename)
+            if not match:
+                logger.warning(f"Skipping invalid filename: {filename}")
+                continue
+            
+            domain_suffix, hour = match.groups()  # '01' or '02', '00'..'72'
+            hour = int(hour)
+            
+            # Determine domain
+            domain_code = SUFFIX_DOMAINS.get(domain_suffix)
+            if domain_code is None:
+                logger.warning(f"Skipping unknown domain file: {filename}")
+                continue
+            
+            # Skip if not in domain filter
+            if domain_filter != 'both' and domain_filter != domain_code:
+                continue
+            
+            # Get domain from database
+            domain = domains.get(domain_code)
+            if domain is None:
+                logger.error(f"Domain {domain_code} not found in database")
+                failed_count += 1
+                continue
+            
+            jobs.append({
+                'path': str(file_path),
+                'filename': filename,
+                'domain': domain,
+                'hour': hour,
+                # Time step 0-24 for 0-72 hours at 3-hour intervals
+                'time_step': hour // 3,
+                'valid_time': forecast_run.initialization_time + timedelta(hours=hour),
+            })
+        
+        if not jobs:
+            self.stdout.write(self.style.WARNING('No GRIB files to process'))
+            return
+        
+        # GRIB decoding is CPU-bound and independent per file: decode in worker
+        # processes, write to the database here. Workers are started without
+        # fork - the SSH transport threads (and the DB connection) are live
+        # here, and forking with their locks held can deadlock the children.
+        start_methods = multiprocessing.get_all_start_methods()
+        mp_context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in start_methods else 'spawn'
+        )
+        
+        decode_workers = settings.WRF_CONFIG.get('DECODE_WORKERS') or os.cpu_count() or 1
+        max_workers = min(decode_workers, len(jobs))
+        
+        # Stream mode ships the file bytes to the worker, which decodes them
+        # from tmpfs; the next file downloads while earlier ones decode
+        if fetcher is not None:
+            load = fetcher.fetch_bytes
+        else:
+            load = str
+        
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            def submit(job):
+                # A failed read becomes that job's failed future instead of
+                # aborting the command with decodes still queued
                 try:
-                    domain = Domain.objects.get(code=domain_code, is_active=True)
-                except Domain.DoesNotExist:
-                    logger.error(f"Domain {domain_code} not found in database")
-                    failed_count += 1
-                    continue
-                
-                # Calculate time step (0-24 for 0-72 hours at 3-hour intervals)
-                time_step = hour // 3
-                
-                # Calculate valid time
-                valid_time = forecast_run.initialization_time + timedelta(hours=hour)
+                    return executor.submit(decode_grib_file, load(job['path']), parameter_codes)
+                except Exception as e:
+                    failed = Future()
+                    failed.set_exception(e)
+                    return failed
+            
+            # Sliding window of in-flight decodes: only ~2x workers files' arrays
+            # are held in memory at once instead of the whole run
+            window = 2 * max_workers
+            futures = deque(submit(job) for job in jobs[:window])
+            
+            for i, job in enumerate(jobs, 1):
+                future = futures.popleft()
+                if i - 1 + window < len(jobs):
+                    futures.append(submit(jobs[i - 1 + window]))
                 
                 self.stdout.write(
-                    f'  [{i:3d}/{total_files}] {filename} → {domain_code} T+{hour}h'
+                    f"  [{i:3d}/{len(jobs)}] {job['filename']} → {job['domain'].code} T+{job['hour']}h"
                 )
                 
+                try:
+                    decoded = future.result()
+                except Exception as e:
+                    logger.error(f"Error reading/decoding GRIB file {job['path']}: {e}")
+                    decoded = None
+                
                 # Process GRIB file
-                success = self.process_single_grib(
+                success = decoded is not None and self.process_single_grib(
                     forecast_run=forecast_run,
-                    domain=domain,
-                    grib_path=str(file_path),
-                    time_step=time_step,
-                    valid_time=valid_time,
-                    parameters=parameters
+                    domain=job['domain'],
+                    grib_path=job['path'],
+                    time_step=job['time_step'],
+                    valid_time=job['valid_time'],
+                    parameters=parameters,
+                    decoded=decoded
                 )
                 
                 if success:
@@ -394,15 +502,11 @@ class Command(BaseCommand):
                     failed_count += 1
                     self.stdout.write(self.style.ERROR('    ✗ Failed'))
                 
-                # Update progress
-                progress = 50 + int((i / total_files) * 50)  # 50-100%
-                forecast_run.progress = progress
-                forecast_run.save()
-                
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {e}")
-                failed_count += 1
-                self.stdout.write(self.style.ERROR(f'    ✗ Error: {e}'))
+                # Update progress in 5% steps - finer detail isn't worth an UPDATE per file
+                progress = 50 + int((i / len(jobs)) * 50)  # 50-100%
+                if progress - forecast_run.progress >= 5 or i == len(jobs):
+                    forecast_run.progress = progress
+                    forecast_run.save(update_fields=['progress', 'updated_at'])
         
         self.stdout.write(self.style.SUCCESS(
             f'\n✓ Processed {processed_count}/{total_files} files'
@@ -412,57 +516,69 @@ class Command(BaseCommand):
                 f'⚠️  {failed_count} files failed processing'
             ))
     
-    def process_single_grib(self, forecast_run, domain, grib_path, time_step, valid_time, parameters):
+    def process_single_grib(self, forecast_run, domain, grib_path, time_step, valid_time, parameters,
+                            decoded):
         """
-        Process a single GRIB file and extract all parameters
+        Save the parameters decoded from a single GRIB file (one bulk upsert)
+        
+        Args:
+            decoded: decode_grib_file() output for grib_path
         
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            with GRIBProcessor(grib_path) as processor:
-                for parameter in parameters:
-                    try:
-                        # Extract parameter from GRIB
-                        data = processor.extract_parameter(
-                            parameter_code=parameter.code,
-                            apply_color_mapping=True
-                        )
-                        
-                        if not data:
-                            logger.warning(
-                                f'No data extracted for {parameter.code} from {grib_path}'
-                            )
-                            continue
-                        
-                        # Save to database
-                        forecast_data, created = ForecastData.objects.update_or_create(
-                            forecast_run=forecast_run,
-                            domain=domain,
-                            parameter=parameter,
-                            time_step=time_step,
-                            defaults={
-                                'valid_time': valid_time,
-                                'grid_lats': data['lats'],
-                                'grid_lons': data['lons'],
-                                'values': data['values'],
-                                'color_data': data.get('color_data', []),
-                                'min_value': data['metadata'].get('min'),
-                                'max_value': data['metadata'].get('max'),
-                                'mean_value': data['metadata'].get('mean'),
-                                'source_file': grib_path,
-                            }
+            rows = []
+            for parameter in parameters:
+                try:
+                    extracted = decoded.get(parameter.code)
+                    
+                    if extracted is None:
+                        logger.warning(
+                            f'No data extracted for {parameter.code} from {grib_path}'
                         )
-                        
-                        action = 'Created' if created else 'Updated'
-                        logger.debug(f'{action} {parameter.code} data for {domain.code} T+{time_step*3}h')
-                        
-                    except Exception as e:
-                        logger.error(f'Error extracting {parameter.code}: {e}')
                         continue
-                
-                return True
-                
+                    
+                    values, lats, lons, metadata = extracted
+                    mapper = get_mapper_for_parameter(parameter.code)
+                    
+                    rows.append(ForecastData(
+                        forecast_run=forecast_run,
+                        domain=domain,
+                        parameter=parameter,
+                        time_step=time_step,
+                        valid_time=valid_time,
+                        grid_lats=lats.tolist(),
+                        grid_lons=lons.tolist(),
+                        grid_shape=list(values.shape),
+                        values=parameter.pack_values(values),
+                        color_indices=mapper.map_grid_indices(values).tobytes(),
+                        color_data=None,
+                        min_value=metadata.get('min'),
+                        max_value=metadata.get('max'),
+                        mean_value=metadata.get('mean'),
+                        source_file=grib_path,
+                    ))
+                    
+                except Exception as e:
+                    logger.error(f'Error extracting {parameter.code}: {e}')
+                    continue
+            
+            # Save to database - all parameters of the file in one upsert
+            with transaction.atomic():
+                ForecastData.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['forecast_run', 'domain', 'parameter', 'time_step'],
+                    update_fields=[
+                        'valid_time', 'grid_lats', 'grid_lons', 'grid_shape', 'values',
+                        'color_indices', 'color_data', 'min_value', 'max_value', 'mean_value', 'source_file',
+                    ],
+                )
+            logger.debug(f'Saved {len(rows)} parameters for {domain.code} T+{time_step*3}h')
+            
+            return True
+            
         except Exception as e:
             logger.error(f'Error processing GRIB file {grib_path}: {e}')
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wrf_data', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forecastrun',
+            index=models.Index(condition=models.Q(('status', 'completed')), fields=['-run_date', '-run_time'], name='fr_latest_completed'),
+        ),
+    ]
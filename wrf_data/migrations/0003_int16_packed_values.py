@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-15 10:05
+
+from django.db import migrations, models
+import numpy as np
+
+
+PACKING_DEFAULTS = {
+    'rainfall': (0.01, 300.0),
+    'temp-max': (0.01, 0.0),
+    'temp-min': (0.01, 0.0),
+    'rh': (0.01, 0.0),
+    'cape': (0.5, 0.0),
+}
+
+
+def set_packing_defaults(apps, schema_editor):
+    Parameter = apps.get_model('wrf_data', 'Parameter')
+    for code, (scale, offset) in PACKING_DEFAULTS.items():
+        Parameter.objects.filter(code=code).update(pack_scale=scale, pack_offset=offset)
+
+
+def pack_existing_values(apps, schema_editor):
+    """Quantize the legacy JSON value grids into the new int16 column"""
+    Parameter = apps.get_model('wrf_data', 'Parameter')
+    ForecastData = apps.get_model('wrf_data', 'ForecastData')
+    packing = {p.id: (p.pack_scale, p.pack_offset) for p in Parameter.objects.all()}
+
+    rows = ForecastData.objects.only('id', 'parameter', 'values').iterator(chunk_size=50)
+    for row in rows:
+        if not row.values:
+            continue
+        scale, offset = packing[row.parameter_id]
+        # None (missing) cells become NaN
+        grid = np.array(row.values, dtype=np.float64)
+        q = np.round((grid - offset) / scale)
+        np.clip(q, -32767, 32767, out=q)
+        q[np.isnan(grid)] = -32768
+        ForecastData.objects.filter(id=row.id).update(
+            packed_values=q.astype(np.int16).tobytes(),
+            grid_shape=list(grid.shape),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wrf_data', '0002_forecastrun_fr_latest_completed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parameter',
+            name='pack_scale',
+            field=models.FloatField(default=0.01),
+        ),
+        migrations.AddField(
+            model_name='parameter',
+            name='pack_offset',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(set_packing_defaults, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='forecastdata',
+            name='grid_shape',
+            field=models.JSONField(default=list),
+        ),
+        # JSON lists cannot be cast to bytea in place: pack them into a
+        # side column, then swap it in
+        migrations.AddField(
+            model_name='forecastdata',
+            name='packed_values',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(pack_existing_values, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='forecastdata',
+            name='values',
+        ),
+        migrations.RenameField(
+            model_name='forecastdata',
+            old_name='packed_values',
+            new_name='values',
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 6.0 on 2026-10-15 12:40
+
+from django.db import migrations
+
+
+# Defaults previously seeded by create_default_data (superseded by the
+# official KMD scales in wrf_data.utils.color_mapper)
+OLD_COLOR_SCALES = {
+    'rainfall': [
+        {'min': 0, 'max': 1, 'color': '#ffffff'},
+        {'min': 1, 'max': 2, 'color': '#d3ffbe'},
+        {'min': 2, 'max': 11, 'color': '#55ff00'},
+        {'min': 11, 'max': 21, 'color': '#73dfff'},
+        {'min': 21, 'max': 51, 'color': '#00a9e6'},
+        {'min': 51, 'max': 71, 'color': '#ffaa00'},
+        {'min': 71, 'max': 101, 'color': '#ff5a00'},
+        {'min': 101, 'max': 999, 'color': '#ff0000'},
+    ],
+    'temp-max': [
+        {'min': 0, 'max': 15, 'color': '#70a800'},
+        {'min': 15, 'max': 16, 'color': '#98e600'},
+        {'min': 16, 'max': 21, 'color': '#e6e600'},
+        {'min': 21, 'max': 26, 'color': '#ffaa00'},
+        {'min': 26, 'max': 31, 'color': '#ff5a00'},
+        {'min': 31, 'max': 36, 'color': '#c00000'},
+        {'min': 36, 'max': 50, 'color': '#800000'},
+    ],
+    'temp-min': [
+        {'min': 0, 'max': 5, 'color': '#08306b'},
+        {'min': 5, 'max': 6, 'color': '#0066ff'},
+        {'min': 6, 'max': 11, 'color': '#00a884'},
+        {'min': 11, 'max': 16, 'color': '#70a800'},
+        {'min': 16, 'max': 21, 'color': '#98e600'},
+        {'min': 21, 'max': 26, 'color': '#e6e600'},
+        {'min': 26, 'max': 40, 'color': '#ffaa00'},
+    ],
+    'rh': [
+        {'min': 0, 'max': 20, 'color': '#8B4513'},
+        {'min': 20, 'max': 40, 'color': '#D2691E'},
+        {'min': 40, 'max': 60, 'color': '#F0E68C'},
+        {'min': 60, 'max': 80, 'color': '#90EE90'},
+        {'min': 80, 'max': 100, 'color': '#00CED1'},
+    ],
+    'cape': [
+        {'min': 0, 'max': 500, 'color': '#E0E0E0'},
+        {'min': 500, 'max': 1000, 'color': '#FFFF99'},
+        {'min': 1000, 'max': 2000, 'color': '#FFCC66'},
+        {'min': 2000, 'max': 3000, 'color': '#FF9933'},
+        {'min': 3000, 'max': 5000, 'color': '#FF3333'},
+        {'min': 5000, 'max': 10000, 'color': '#CC0000'},
+    ],
+}
+
+KMD_COLOR_SCALES = {
+    'rainfall': [
+        {'min': 0.0, 'max': 1.0, 'color': '#ffffff'},
+        {'min': 1.0, 'max': 10.0, 'color': '#d3ff55'},
+        {'min': 10.0, 'max': 20.0, 'color': '#73ff55'},
+        {'min': 20.0, 'max': 50.0, 'color': '#55dfff'},
+        {'min': 50.0, 'max': 70.0, 'color': '#55a9ff'},
+        {'min': 70.0, 'max': 100.0, 'color': '#ffaa00'},
+        {'min': 100.0, 'max': 120.0, 'color': '#ff5500'},
+        {'min': 120.0, 'max': 9999, 'color': '#ff0000'},
+    ],
+    'temp-max': [
+        {'min': 0.0, 'max': 15.0, 'color': '#70a800'},
+        {'min': 15.0, 'max': 20.0, 'color': '#98e600'},
+        {'min': 20.0, 'max': 25.0, 'color': '#e6e600'},
+        {'min': 25.0, 'max': 30.0, 'color': '#ffaa00'},
+        {'min': 30.0, 'max': 35.0, 'color': '#ff5a00'},
+        {'min': 35.0, 'max': 9999, 'color': '#c00000'},
+    ],
+    'temp-min': [
+        {'min': 0.0, 'max': 5.0, 'color': '#00006b'},
+        {'min': 5.0, 'max': 10.0, 'color': '#0030ff'},
+        {'min': 10.0, 'max': 15.0, 'color': '#00a8a8'},
+        {'min': 15.0, 'max': 20.0, 'color': '#70a800'},
+        {'min': 20.0, 'max': 25.0, 'color': '#98e600'},
+        {'min': 25.0, 'max': 9999, 'color': '#e6e600'},
+    ],
+    'rh': [
+        {'min': 0, 'max': 20, 'color': '#8B4513'},
+        {'min': 20, 'max': 40, 'color': '#D2691E'},
+        {'min': 40, 'max': 60, 'color': '#F0E68C'},
+        {'min': 60, 'max': 80, 'color': '#90EE90'},
+        {'min': 80, 'max': 100, 'color': '#00CED1'},
+    ],
+    'cape': [
+        {'min': 0, 'max': 500, 'color': '#f0f0f0'},
+        {'min': 500, 'max': 1000, 'color': '#ffff99'},
+        {'min': 1000, 'max': 2000, 'color': '#ffcc66'},
+        {'min': 2000, 'max': 3000, 'color': '#ff9933'},
+        {'min': 3000, 'max': 5000, 'color': '#ff3333'},
+        {'min': 5000, 'max': 99999, 'color': '#cc0000'},
+    ],
+}
+
+
+def _swap_scales(apps, source, target):
+    Parameter = apps.get_model('wrf_data', 'Parameter')
+    for code, scale in source.items():
+        # Only touch rows still on the seeded default (keep admin edits)
+        for parameter in Parameter.objects.filter(code=code):
+            if parameter.color_scale == scale:
+                parameter.color_scale = target[code]
+                parameter.save(update_fields=['color_scale'])
+
+
+def use_kmd_scales(apps, schema_editor):
+    _swap_scales(apps, OLD_COLOR_SCALES, KMD_COLOR_SCALES)
+
+
+def restore_old_scales(apps, schema_editor):
+    _swap_scales(apps, KMD_COLOR_SCALES, OLD_COLOR_SCALES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wrf_data', '0003_int16_packed_values'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_kmd_scales, restore_old_scales),
+    ]
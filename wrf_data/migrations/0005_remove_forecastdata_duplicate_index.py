@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-15 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wrf_data', '0004_kmd_color_scales'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='forecastdata',
+            name='wrf_data_fo_forecas_9b6718_idx',
+        ),
+    ]
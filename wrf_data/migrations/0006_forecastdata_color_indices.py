@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-15 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wrf_data', '0005_remove_forecastdata_duplicate_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastdata',
+            name='color_indices',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AlterField(
+            model_name='forecastdata',
+            name='color_data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-15 18:20
+
+from django.db import migrations
+import numpy as np
+
+
+RAINFALL_PACKING = (0.05, 1600.0)  # -38.35 to 3238.35 mm
+
+
+def repack_rainfall(apps, schema_editor):
+    """Re-quantize stored rainfall grids from the old 0.01/300 range"""
+    Parameter = apps.get_model('wrf_data', 'Parameter')
+    ForecastData = apps.get_model('wrf_data', 'ForecastData')
+
+    parameter = Parameter.objects.filter(code='rainfall').first()
+    if parameter is None:
+        return
+    old_scale, old_offset = parameter.pack_scale, parameter.pack_offset
+    new_scale, new_offset = RAINFALL_PACKING
+    if (old_scale, old_offset) == (new_scale, new_offset):
+        return
+
+    rows = ForecastData.objects.filter(parameter=parameter).only('id', 'values').iterator(chunk_size=50)
+    for row in rows:
+        if not row.values:
+            continue
+        q = np.frombuffer(bytes(row.values), dtype=np.int16)
+        missing = q == -32768
+        values = q.astype(np.float64) * old_scale + old_offset
+        q_new = np.clip(np.round((values - new_offset) / new_scale), -32767, 32767)
+        q_new[missing] = -32768
+        ForecastData.objects.filter(id=row.id).update(values=q_new.astype(np.int16).tobytes())
+
+    Parameter.objects.filter(id=parameter.id).update(pack_scale=new_scale, pack_offset=new_offset)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wrf_data', '0006_forecastdata_color_indices'),
+    ]
+
+    operations = [
+        migrations.RunPython(repack_rainfall, migrations.RunPython.noop),
+    ]
@@ -4,9 +4,15 @@ File: wrf_data/models.py
 """
 
 from django.db import models
+from django.db.models import Q
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import json
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 
 class Domain(models.Model):
@@ -37,6 +43,20 @@ class Domain(models.Model):
         return f"{self.name} ({self.resolution_km}km)"
 
 
+# int16 packing (scale, offset) per parameter code: value = q * scale + offset
+PACKING_DEFAULTS = {
+    'rainfall': (0.05, 1600.0),  # -38.35 to 3238.35 mm at 0.05 mm (72 h totals)
+    'temp-max': (0.01, 0.0),    # +/-327.67 °C at 0.01 °C
+    'temp-min': (0.01, 0.0),
+    'rh': (0.01, 0.0),          # 0-100 % at 0.01 %
+    'cape': (0.5, 0.0),         # 0-16383 J/kg at 0.5 J/kg
+}
+
+# int16 value reserved for NaN (missing) cells
+PACKED_NAN = -32768
+PACKED_MIN, PACKED_MAX = PACKED_NAN + 1, 32767
+
+
 class Parameter(models.Model):
     """
     Represents a weather parameter (rainfall, temperature, etc.)
@@ -49,6 +69,8 @@ class Parameter(models.Model):
     min_value = models.FloatField(null=True, blank=True)
     max_value = models.FloatField(null=True, blank=True)
     color_scale = models.JSONField(default=list)  # Color scale configuration
+    pack_scale = models.FloatField(default=0.01)  # int16 storage: value = q * scale + offset
+    pack_offset = models.FloatField(default=0.0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -58,6 +80,53 @@ class Parameter(models.Model):
         
     def __str__(self):
         return f"{self.name} ({self.unit})"
+    
+    def pack_values(self, values: np.ndarray) -> bytes:
+        """
+        Quantize a grid to int16 bytes using this parameter's scale/offset
+        NaN cells are stored as PACKED_NAN; cells outside the packable range
+        are saturated to the nearest limit and logged
+        """
+        # float32 is exact enough for 16-bit levels; asarray skips the copy
+        # for the float32 grids read_arrays returns
+        values = np.asarray(values, dtype=np.float32)
+        q = np.subtract(values, self.pack_offset)
+        q /= self.pack_scale
+        np.round(q, out=q)
+        saturated = np.count_nonzero((q < PACKED_MIN) | (q > PACKED_MAX))
+        if saturated:
+            logger.warning(
+                f"⚠️  {self.code}: {saturated} cells outside the int16 range "
+                f"[{self.pack_min}, {self.pack_max}] were clipped"
+            )
+        np.clip(q, PACKED_MIN, PACKED_MAX, out=q)
+        q[np.isnan(values)] = PACKED_NAN
+        return q.astype(np.int16).tobytes()
+    
+    @property
+    def pack_min(self) -> float:
+        """Smallest value pack_values can store"""
+        return PACKED_MIN * self.pack_scale + self.pack_offset
+    
+    @property
+    def pack_max(self) -> float:
+        """Largest value pack_values can store"""
+        return PACKED_MAX * self.pack_scale + self.pack_offset
+    
+    def unpack_values(self, data: bytes, shape) -> np.ndarray:
+        """
+        Decode int16 bytes produced by pack_values back to a float32 grid
+        """
+        q = np.frombuffer(bytes(data), dtype=np.int16).reshape(shape)
+        values = q.astype(np.float32) * np.float32(self.pack_scale) + np.float32(self.pack_offset)
+        values[q == PACKED_NAN] = np.nan
+        return values
+
+
+LATEST_RUN_CACHE_KEY = 'latest_forecast_run_id'
+CATALOG_CACHE_KEY = 'wrf:catalog:v2'  # Serialized active domains/parameters (views)
+PROGRESS_CACHE_KEY = 'wrf:run:{}:progress'
+PROGRESS_CACHE_TIMEOUT = 3600
 
 
 class ForecastRun(models.Model):
@@ -98,15 +167,59 @@ class ForecastRun(models.Model):
         indexes = [
             models.Index(fields=['-run_date', '-run_time']),
             models.Index(fields=['status']),
+            # Partial index backing the latest-completed-run lookup
+            models.Index(
+                fields=['-run_date', '-run_time'],
+                condition=Q(status='completed'),
+                name='fr_latest_completed',
+            ),
         ]
         
     def __str__(self):
         return f"Forecast Run {self.run_date} {self.run_time} - {self.status}"
     
+    @classmethod
+    def latest_completed_id(cls):
+        """ID of the latest completed run (cached, invalidated on save)"""
+        return cache.get_or_set(
+            LATEST_RUN_CACHE_KEY,
+            lambda: cls.objects.filter(status='completed')
+                               .order_by('-run_date', '-run_time')
+                               .values_list('id', flat=True)
+                               .first(),
+            60
+        )
+    
     def is_latest(self):
         """Check if this is the latest forecast run"""
-        latest = ForecastRun.objects.filter(status='completed').order_by('-run_date', '-run_time').first()
-        return latest and latest.id == self.id
+        return self.latest_completed_id() == self.id
+    
+    def set_live_progress(self, value):
+        """Record in-flight progress in the cache without touching the DB row"""
+        cache.set(PROGRESS_CACHE_KEY.format(self.id), value, PROGRESS_CACHE_TIMEOUT)
+    
+    def add_live_progress(self, delta, cap=99):
+        """Atomically bump the cached progress counter (used by parallel workers)"""
+        key = PROGRESS_CACHE_KEY.format(self.id)
+        cache.add(key, self.progress, PROGRESS_CACHE_TIMEOUT)
+        try:
+            return min(cache.incr(key, delta), cap)
+        except ValueError:
+            # Key expired between add and incr
+            self.set_live_progress(min(self.progress + delta, cap))
+            return min(self.progress + delta, cap)
+    
+    def clear_live_progress(self):
+        """Drop the cached counter once the final value is on the row"""
+        cache.delete(PROGRESS_CACHE_KEY.format(self.id))
+    
+    @property
+    def live_progress(self):
+        """Cached in-flight progress, falling back to the DB column"""
+        if self.status in ('completed', 'failed'):
+            return self.progress
+        value = cache.get(PROGRESS_CACHE_KEY.format(self.id))
+        return self.progress if value is None else min(value, 100)
 
 
 class ForecastData(models.Model):
@@ -123,10 +236,12 @@ class ForecastData(models.Model):
     # Grid data
     grid_lats = models.JSONField()  # 2D array of latitudes
     grid_lons = models.JSONField()  # 2D array of longitudes
-    values = models.JSONField()  # 2D array of parameter values
+    grid_shape = models.JSONField(default=list)  # [rows, cols] of the grid
+    values = models.BinaryField(default=bytes)  # int16 grid packed with the parameter's scale/offset
     
     # Color-mapped data (ready for frontend)
-    color_data = models.JSONField()  # 2D array of color values based on color scale
+    color_indices = models.BinaryField(default=bytes)  # uint8 palette index per cell (ColorMapper.map_grid_indices)
+    color_data = models.JSONField(null=True, blank=True)  # Legacy 2D color grid, only set on rows written before color_indices
     
     # Statistics
     min_value = models.FloatField(null=True, blank=True)
@@ -141,14 +256,24 @@ class ForecastData(models.Model):
     class Meta:
         ordering = ['forecast_run', 'domain', 'parameter', 'time_step']
         unique_together = ['forecast_run', 'domain', 'parameter', 'time_step']
+        # unique_together already builds the (run, domain, parameter, step) index
         indexes = [
-            models.Index(fields=['forecast_run', 'domain', 'parameter', 'time_step']),
             models.Index(fields=['valid_time']),
         ]
         
     def __str__(self):
         return f"{self.forecast_run} - {self.domain.code} - {self.parameter.code} - T+{self.time_step*3}h"
 
+    def color_grid(self):
+        """
+        2D array of color strings, expanded from color_indices on demand
+        """
+        if not self.color_indices:
+            return self.color_data or []
+        from .utils.color_mapper import get_mapper_for_parameter
+        indices = np.frombuffer(bytes(self.color_indices), dtype=np.uint8).reshape(self.grid_shape)
+        return get_mapper_for_parameter(self.parameter.code).colors_for_indices(indices)
+
 
 class DataFetchLog(models.Model):
     """
@@ -191,19 +316,45 @@ class DataFetchLog(models.Model):
             'level': level,
             'message': message
         })
-        self.save()
+        self.save(update_fields=['log_messages'])
 
 
-# Signal to create default domains and parameters
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 from django.dispatch import receiver
 
+
+# Signal to invalidate the cached latest run
+@receiver(post_save, sender=ForecastRun)
+def invalidate_latest_run_cache(sender, instance, **kwargs):
+    """
+    Drop the cached latest-completed run ID whenever a run is saved
+    """
+    cache.delete(LATEST_RUN_CACHE_KEY)
+
+
+# Signal to invalidate the cached domain/parameter catalog
+@receiver([post_save, post_delete], sender=Domain)
+@receiver([post_save, post_delete], sender=Parameter)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """
+    Drop the cached serialized domains/parameters whenever one changes
+    """
+    cache.delete(CATALOG_CACHE_KEY)
+
+
+# Signal to create default domains and parameters
 @receiver(post_migrate)
 def create_default_data(sender, **kwargs):
     """
     Create default domains and parameters after migration
     """
     if sender.name == 'wrf_data':
+        from .utils.color_mapper import get_mapper_for_parameter
+        
+        def kmd_scale(code):
+            # Color scales come from color_mapper (single source of truth)
+            return [dict(item) for item in get_mapper_for_parameter(code).color_scale]
+        
         # Create domains if they don't exist
         Domain.objects.get_or_create(
             code='kenya',
@@ -242,18 +393,6 @@ def create_default_data(sender, **kwargs):
         )
         
         # Create parameters if they don't exist
-        # Rainfall color scale (from your frontend)
-        rainfall_colors = [
-            {'min': 0, 'max': 1, 'color': '#ffffff'},
-            {'min': 1, 'max': 2, 'color': '#d3ffbe'},
-            {'min': 2, 'max': 11, 'color': '#55ff00'},
-            {'min': 11, 'max': 21, 'color': '#73dfff'},
-            {'min': 21, 'max': 51, 'color': '#00a9e6'},
-            {'min': 51, 'max': 71, 'color': '#ffaa00'},
-            {'min': 71, 'max': 101, 'color': '#ff5a00'},
-            {'min': 101, 'max': 999, 'color': '#ff0000'},
-        ]
-        
         Parameter.objects.get_or_create(
             code='rainfall',
             defaults={
@@ -263,21 +402,12 @@ def create_default_data(sender, **kwargs):
                 'description': 'Total accumulated rainfall',
                 'min_value': 0,
                 'max_value': 500,
-                'color_scale': rainfall_colors
+                'color_scale': kmd_scale('rainfall'),
+                'pack_scale': PACKING_DEFAULTS['rainfall'][0],
+                'pack_offset': PACKING_DEFAULTS['rainfall'][1],
             }
         )
         
-        # Max Temperature color scale
-        temp_max_colors = [
-            {'min': 0, 'max': 15, 'color': '#70a800'},
-            {'min': 15, 'max': 16, 'color': '#98e600'},
-            {'min': 16, 'max': 21, 'color': '#e6e600'},
-            {'min': 21, 'max': 26, 'color': '#ffaa00'},
-            {'min': 26, 'max': 31, 'color': '#ff5a00'},
-            {'min': 31, 'max': 36, 'color': '#c00000'},
-            {'min': 36, 'max': 50, 'color': '#800000'},
-        ]
-        
         Parameter.objects.get_or_create(
             code='temp-max',
             defaults={
@@ -287,21 +417,12 @@ def create_default_data(sender, **kwargs):
                 'description': 'Maximum temperature at 2 meters',
                 'min_value': -10,
                 'max_value': 50,
-                'color_scale': temp_max_colors
+                'color_scale': kmd_scale('temp-max'),
+                'pack_scale': PACKING_DEFAULTS['temp-max'][0],
+                'pack_offset': PACKING_DEFAULTS['temp-max'][1],
             }
         )
         
-        # Min Temperature color scale
-        temp_min_colors = [
-            {'min': 0, 'max': 5, 'color': '#08306b'},
-            {'min': 5, 'max': 6, 'color': '#0066ff'},
-            {'min': 6, 'max': 11, 'color': '#00a884'},
-            {'min': 11, 'max': 16, 'color': '#70a800'},
-            {'min': 16, 'max': 21, 'color': '#98e600'},
-            {'min': 21, 'max': 26, 'color': '#e6e600'},
-            {'min': 26, 'max': 40, 'color': '#ffaa00'},
-        ]
-        
         Parameter.objects.get_or_create(
             code='temp-min',
             defaults={
@@ -311,19 +432,12 @@ def create_default_data(sender, **kwargs):
                 'description': 'Minimum temperature at 2 meters',
                 'min_value': -10,
                 'max_value': 40,
-                'color_scale': temp_min_colors
+                'color_scale': kmd_scale('temp-min'),
+                'pack_scale': PACKING_DEFAULTS['temp-min'][0],
+                'pack_offset': PACKING_DEFAULTS['temp-min'][1],
             }
         )
         
-        # Relative Humidity (generic color scale)
-        rh_colors = [
-            {'min': 0, 'max': 20, 'color': '#8B4513'},
-            {'min': 20, 'max': 40, 'color': '#D2691E'},
-            {'min': 40, 'max': 60, 'color': '#F0E68C'},
-            {'min': 60, 'max': 80, 'color': '#90EE90'},
-            {'min': 80, 'max': 100, 'color': '#00CED1'},
-        ]
-        
         Parameter.objects.get_or_create(
             code='rh',
             defaults={
@@ -333,20 +447,12 @@ def create_default_data(sender, **kwargs):
                 'description': 'Relative humidity at 2 meters',
                 'min_value': 0,
                 'max_value': 100,
-                'color_scale': rh_colors
+                'color_scale': kmd_scale('rh'),
+                'pack_scale': PACKING_DEFAULTS['rh'][0],
+                'pack_offset': PACKING_DEFAULTS['rh'][1],
             }
         )
         
-        # CAPE (generic color scale)
-        cape_colors = [
-            {'min': 0, 'max': 500, 'color': '#E0E0E0'},
-            {'min': 500, 'max': 1000, 'color': '#FFFF99'},
-            {'min': 1000, 'max': 2000, 'color': '#FFCC66'},
-            {'min': 2000, 'max': 3000, 'color': '#FF9933'},
-            {'min': 3000, 'max': 5000, 'color': '#FF3333'},
-            {'min': 5000, 'max': 10000, 'color': '#CC0000'},
-        ]
-        
         Parameter.objects.get_or_create(
             code='cape',
             defaults={
@@ -356,6 +462,8 @@ def create_default_data(sender, **kwargs):
                 'description': 'Convective Available Potential Energy',
                 'min_value': 0,
                 'max_value': 10000,
-                'color_scale': cape_colors
+                'color_scale': kmd_scale('cape'),
+                'pack_scale': PACKING_DEFAULTS['cape'][0],
+                'pack_offset': PACKING_DEFAULTS['cape'][1],
             }
         )
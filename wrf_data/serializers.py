@@ -4,6 +4,7 @@ File: wrf_data/serializers.py
 """
 
 from rest_framework import serializers
+import numpy as np
 from .models import Domain, Parameter, ForecastRun, ForecastData, DataFetchLog
 
 
@@ -40,6 +41,8 @@ class ForecastRunListSerializer(serializers.ModelSerializer):
     """
     Serializer for listing forecast runs (minimal data)
     """
+    progress = serializers.IntegerField(source='live_progress', read_only=True)
+    
     class Meta:
         model = ForecastRun
         fields = [
@@ -55,6 +58,8 @@ class ForecastRunDetailSerializer(serializers.ModelSerializer):
     """
     Serializer for detailed forecast run information
     """
+    progress = serializers.IntegerField(source='live_progress', read_only=True)
+    
     class Meta:
         model = ForecastRun
         fields = '__all__'
@@ -67,6 +72,8 @@ class ForecastDataSerializer(serializers.ModelSerializer):
     """
     domain_info = DomainSerializer(source='domain', read_only=True)
     parameter_info = ParameterSerializer(source='parameter', read_only=True)
+    values = serializers.SerializerMethodField()
+    color_data = serializers.SerializerMethodField()
     
     class Meta:
         model = ForecastData
@@ -79,6 +86,17 @@ class ForecastDataSerializer(serializers.ModelSerializer):
             'source_file', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+    
+    def get_values(self, obj):
+        """Decode the int16-packed grid back to floats"""
+        if not obj.values:
+            return []
+        values = obj.parameter.unpack_values(obj.values, obj.grid_shape)
+        return np.where(np.isnan(values), None, values).tolist()
+
+    def get_color_data(self, obj):
+        """Expand the stored palette indices to color strings"""
+        return obj.color_grid()
 
 
 class ForecastDataMinimalSerializer(serializers.ModelSerializer):
@@ -110,6 +128,7 @@ class ForecastDataGridSerializer(serializers.ModelSerializer):
     parameter_name = serializers.CharField(source='parameter.name')
     unit = serializers.CharField(source='parameter.unit')
     color_scale = serializers.JSONField(source='parameter.color_scale')
+    color_data = serializers.SerializerMethodField()
     
     class Meta:
         model = ForecastData
@@ -120,6 +139,10 @@ class ForecastDataGridSerializer(serializers.ModelSerializer):
             'min_value', 'max_value', 'color_scale'
         ]
 
+    def get_color_data(self, obj):
+        """Expand the stored palette indices to color strings"""
+        return obj.color_grid()
+
 
 class DataFetchLogSerializer(serializers.ModelSerializer):
     """
@@ -9,252 +9,425 @@ from django.utils import timezone
 from django.conf import settings
 from datetime import datetime, timedelta
 import logging
-from celery import shared_task
 import os
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
-def fetch_wrf_data_task(self, date_str=None):
+def _parse_fetch_date(date_str=None):
+    """Parse an ISO date string, defaulting to today"""
+    if date_str:
+        return datetime.fromisoformat(date_str).date()
+    return timezone.now().date()
+
+
+def _get_run_datetime(fetch_date):
+    """Combine a fetch date with the configured model run time (19:00 EAT)"""
+    run_time = datetime.strptime(settings.WRF_CONFIG['BASE_TIME'], '%H:%M').time()
+    return datetime.combine(fetch_date, run_time)
+
+
+def _start_run(fetch_date):
     """
-    Celery task to fetch and process WRF data from SSH server
+    Create (or reset) the ForecastRun and its DataFetchLog for a date
     
-    Args:
-        date_str: Date string in ISO format (YYYY-MM-DD). If None, uses today.
+    Returns:
+        tuple: (forecast_run, fetch_log, run_datetime)
+    """
+    from .models import ForecastRun, DataFetchLog
+    
+    run_datetime = _get_run_datetime(fetch_date)
+    run_time = run_datetime.time()
+    
+    logger.info(f"🚀 Starting WRF data fetch for: {fetch_date} at {run_time}")
+    
+    # Create or get ForecastRun
+    forecast_run, created = ForecastRun.objects.get_or_create(
+        run_date=fetch_date,
+        run_time=run_time,
+        defaults={
+            'status': 'fetching',
+            'progress': 0,
+            'initialization_time': timezone.make_aware(run_datetime),
+            'forecast_hours': settings.WRF_CONFIG['FORECAST_HOURS'],
+        }
+    )
+    
+    if not created:
+        forecast_run.status = 'fetching'
+        forecast_run.progress = 0
+        forecast_run.error_message = ''
+        forecast_run.save(update_fields=['status', 'progress', 'error_message', 'updated_at'])
+        forecast_run.clear_live_progress()
+    
+    # Create fetch log
+    fetch_log = DataFetchLog.objects.create(
+        forecast_run=forecast_run,
+        status='success',
+        ssh_host=settings.WRF_CONFIG['SSH_HOST'],
+        ssh_user=settings.WRF_CONFIG['SSH_USERNAME'],
+    )
+    
+    return forecast_run, fetch_log, run_datetime
+
+
+def _download_run(forecast_run, fetch_log, run_datetime):
+    """
+    Download all GRIB files for the run and mark it as processing
     
     Returns:
-        dict: Status information about the fetch operation
+        Path: Local folder holding the downloaded GRIB files
     """
-    from .models import ForecastRun, ForecastData, Domain, Parameter, DataFetchLog
     from .utils.ssh_fetcher import create_fetcher_from_config
+    
+    # Initialize SSH fetcher
+    fetcher = create_fetcher_from_config(settings.WRF_CONFIG)
+    
+    # Download GRIB files
+    logger.info("📥 Connecting to SSH server...")
+    download_results = fetcher.download_forecast_run(
+        run_date=run_datetime,
+        domain='both',
+        max_hours=settings.WRF_CONFIG['FORECAST_HOURS']
+    )
+    
+    # Update fetch log
+    fetch_log.files_requested = download_results['total']
+    fetch_log.files_downloaded = len(download_results['success'])
+    fetch_log.completed_at = timezone.now()
+    
+    if len(download_results['failed']) > 0:
+        fetch_log.status = 'partial'
+        fetch_log.error_message = f"Failed to download {len(download_results['failed'])} files"
+    
+    fetch_log.save(update_fields=[
+        'files_requested', 'files_downloaded', 'completed_at', 'status', 'error_message',
+    ])
+    
+    # Update forecast run status
+    forecast_run.status = 'processing'
+    forecast_run.progress = 30
+    forecast_run.save(update_fields=['status', 'progress', 'updated_at'])
+    
+    return settings.WRF_CONFIG['LOCAL_DATA_PATH'] / download_results['run_folder']
+
+
+def _process_domain_parameter(forecast_run, domain, parameter, local_folder, run_datetime):
+    """
+    Process all 25 timesteps of one (domain, parameter) pair into ForecastData rows
+    
+    Rows are written in one bulk upsert after the last timestep.
+    
+    Returns:
+        int: Number of timesteps processed
+    """
+    from django.db import transaction
+    from .models import ForecastData
     from .utils.grib_processor import GRIBProcessor
     from .utils.color_mapper import get_mapper_for_parameter
     import numpy as np
     
-    try:
-        # Parse date
-        if date_str:
-            fetch_date = datetime.fromisoformat(date_str).date()
-        else:
-            fetch_date = timezone.now().date()
-        
-        # Set run time to 19:00 (7 PM EAT - when WRF runs)
-        run_time = datetime.strptime(settings.WRF_CONFIG['BASE_TIME'], '%H:%M').time()
-        run_datetime = datetime.combine(fetch_date, run_time)
-        
-        logger.info(f"🚀 Starting WRF data fetch for: {fetch_date} at {run_time}")
-        
-        # Create or get ForecastRun
-        forecast_run, created = ForecastRun.objects.get_or_create(
-            run_date=fetch_date,
-            run_time=run_time,
-            defaults={
-                'status': 'fetching',
-                'progress': 0,
-                'initialization_time': timezone.make_aware(run_datetime),
-                'forecast_hours': settings.WRF_CONFIG['FORECAST_HOURS'],
-            }
-        )
-        
-        if not created:
-            forecast_run.status = 'fetching'
-            forecast_run.progress = 0
-            forecast_run.error_message = ''
-            forecast_run.save()
-        
-        # Create fetch log
-        fetch_log = DataFetchLog.objects.create(
-            forecast_run=forecast_run,
-            status='success',
-            ssh_host=settings.WRF_CONFIG['SSH_HOST'],
-            ssh_user=settings.WRF_CONFIG['SSH_USERNAME'],
-        )
-        
-        # Initialize SSH fetcher
-        fetcher = create_fetcher_from_config(settings.WRF_CONFIG)
+    logger.info(f"    Processing {domain.name} / {parameter.name}")
+    
+    processed_count = 0
+    pending = []
+    mapper = get_mapper_for_parameter(parameter.code)
+    
+    # Valid time of every timestep (EAT has no DST, so offsets add cleanly)
+    run_start = timezone.make_aware(run_datetime)
+    valid_times = [run_start + timedelta(hours=3 * t) for t in range(25)]
+    
+    # Track cumulative values for parameters that need it
+    previous_values = None
+    
+    # Lat/lon lists - the domain grid is the same for every timestep, so the
+    # coordinates are decoded and converted once per pair
+    grid_lats = grid_lons = None
+    
+    for timestep in range(25):  # 0-72 hours at 3-hour intervals
+        hour = timestep * 3
         
-        # Download GRIB files
-        logger.info("📥 Connecting to SSH server...")
-        download_results = fetcher.download_forecast_run(
-            run_date=run_datetime,
-            domain='both',
-            max_hours=settings.WRF_CONFIG['FORECAST_HOURS']
-        )
+        try:
+            # Construct GRIB file path
+            domain_suffix = domain.file_suffix
+            grib_filename = f'WRFPRS_d{domain_suffix}.{hour:02d}'
+            grib_file = local_folder / grib_filename
+            
+            if not grib_file.exists():
+                logger.warning(f"      ⚠️  File not found: {grib_filename}")
+                continue
+            
+            # Extract data from GRIB
+            with GRIBProcessor(str(grib_file)) as processor:
+                extracted = processor.read_arrays(parameter.code, include_coords=grid_lats is None)
+            
+            if extracted is None:
+                logger.warning(f"      ⚠️  No data extracted for {parameter.code}")
+                continue
+            
+            values, lats, lons, _ = extracted
+            # Pin the accumulator dtype; a no-op for read_arrays' float32 grids
+            values = values.astype(np.float32, copy=False)
+            if grid_lats is None:
+                grid_lats, grid_lons = lats.tolist(), lons.tolist()
+            
+            # Apply cumulative/running aggregation. read_arrays returns a fresh
+            # array every timestep and the running array is never written
+            # again, so both are updated in place and shared without copies.
+            if parameter.code == 'rainfall':
+                # Rainfall: cumulative sum
+                if previous_values is not None:
+                    values += previous_values
+                previous_values = values
+            
+            elif parameter.code == 'temp-max':
+                # Max temperature: running maximum
+                if previous_values is not None:
+                    np.maximum(previous_values, values, out=values)
+                previous_values = values
+            
+            elif parameter.code == 'temp-min':
+                # Min temperature: running minimum
+                if previous_values is not None:
+                    np.minimum(previous_values, values, out=values)
+                previous_values = values
+            
+            # Apply color mapping (palette indices; colors are expanded on read)
+            color_indices = mapper.map_grid_indices(values).tobytes()
+            
+            # Calculate statistics via nan-aware reductions (no boolean-mask copy)
+            max_val = float(np.nanmax(values)) if values.size else float('nan')
+            if np.isnan(max_val):  # empty or all-NaN grid
+                min_val = max_val = mean_val = None
+            else:
+                min_val = float(np.nanmin(values))
+                mean_val = float(np.nanmean(values))
+            
+            # Calculate valid time
+            valid_time = valid_times[timestep]
+            
+            # Queue for the bulk write below
+            pending.append(ForecastData(
+                forecast_run=forecast_run,
+                domain=domain,
+                parameter=parameter,
+                time_step=timestep,
+                valid_time=valid_time,
+                grid_lats=grid_lats,
+                grid_lons=grid_lons,
+                grid_shape=list(values.shape),
+                values=parameter.pack_values(values),
+                color_indices=color_indices,
+                color_data=None,
+                min_value=min_val,
+                max_value=max_val,
+                mean_value=mean_val,
+                source_file=grib_filename,
+            ))
+            
+            processed_count += 1
+            
+            logger.info(f"      ✓ Processed T+{hour}h")
         
-        # Update fetch log
-        fetch_log.files_requested = download_results['total']
-        fetch_log.files_downloaded = len(download_results['success'])
+        except Exception as e:
+            logger.error(f"      ❌ Error processing timestep {hour}h: {e}")
+            continue
+    
+    # One upsert for all timesteps instead of a SELECT + INSERT/UPDATE per row
+    if pending:
+        try:
+            with transaction.atomic():
+                ForecastData.objects.bulk_create(
+                    pending,
+                    update_conflicts=True,
+                    unique_fields=['forecast_run', 'domain', 'parameter', 'time_step'],
+                    update_fields=[
+                        'valid_time', 'grid_lats', 'grid_lons', 'grid_shape', 'values',
+                        'color_indices', 'color_data', 'min_value', 'max_value', 'mean_value', 'source_file',
+                    ],
+                )
+        except Exception as e:
+            # Raise so the caller's retry/failure path runs instead of an empty success
+            logger.error(f"      ❌ Error saving {domain.name} / {parameter.name}: {e}")
+            raise
+    
+    return processed_count
+
+
+def _complete_run(forecast_run, processed_count):
+    """Mark a forecast run as completed"""
+    forecast_run.status = 'completed'
+    forecast_run.progress = 100
+    forecast_run.completed_at = timezone.now()
+    forecast_run.save(update_fields=['status', 'progress', 'completed_at', 'updated_at'])
+    forecast_run.clear_live_progress()
+    
+    logger.info(f"✅ WRF data fetch completed for {forecast_run.run_date}")
+    logger.info(f"   Processed {processed_count} data points")
+    
+    return {
+        'status': 'success',
+        'date': forecast_run.run_date.isoformat(),
+        'forecast_run_id': forecast_run.id,
+        'processed_count': processed_count,
+        'message': f'Successfully fetched and processed WRF data for {forecast_run.run_date}'
+    }
+
+
+def _fail_run(forecast_run, fetch_log, error):
+    """Record a failure on the forecast run and its fetch log"""
+    # Update forecast run status
+    if forecast_run is not None:
+        forecast_run.status = 'failed'
+        forecast_run.error_message = str(error)
+        forecast_run.save(update_fields=['status', 'error_message', 'updated_at'])
+        forecast_run.clear_live_progress()
+    
+    # Update fetch log
+    if fetch_log is not None:
+        fetch_log.status = 'failed'
+        fetch_log.error_message = str(error)
         fetch_log.completed_at = timezone.now()
+        fetch_log.save(update_fields=['status', 'error_message', 'completed_at'])
+
+
+@shared_task(bind=True, max_retries=3)
+def fetch_wrf_data_task(self, date_str=None):
+    """
+    Celery task to fetch WRF data from SSH server and fan out processing
+    
+    Downloads the run once, then processes each (domain, parameter) pair as
+    its own child task in a chord; finalize_run marks the run completed and
+    fail_run_on_error marks it failed if any child exhausts its retries.
+    Chords need a result backend (CELERY_RESULT_BACKEND).
+    
+    Args:
+        date_str: Date string in ISO format (YYYY-MM-DD). If None, uses today.
+    
+    Returns:
+        dict: Status information about the dispatched run
+    """
+    from celery import chord
+    from celery.backends.base import DisabledBackend
+    from django.core.exceptions import ImproperlyConfigured
+    from .models import Domain, Parameter
+    
+    # Without a result backend the chord callback never fires and the run
+    # would stay 'processing' forever - refuse before creating the run
+    if isinstance(self.app.backend, DisabledBackend):
+        logger.error("❌ CELERY_RESULT_BACKEND is not configured; cannot run the fetch chord")
+        raise ImproperlyConfigured("fetch_wrf_data_task needs CELERY_RESULT_BACKEND")
+    
+    forecast_run = None
+    fetch_log = None
+    
+    try:
+        fetch_date = _parse_fetch_date(date_str)
+        forecast_run, fetch_log, run_datetime = _start_run(fetch_date)
+        self.update_state(state='PROGRESS', meta={'progress': 0})
         
-        if len(download_results['failed']) > 0:
-            fetch_log.status = 'partial'
-            fetch_log.error_message = f"Failed to download {len(download_results['failed'])} files"
-        
-        fetch_log.save()
-        
-        # Update forecast run status
-        forecast_run.status = 'processing'
-        forecast_run.progress = 30
-        forecast_run.save()
-        
-        # Process downloaded GRIB files
-        logger.info("⚙️  Processing GRIB files...")
-        
-        domains = Domain.objects.filter(is_active=True)
-        parameters = Parameter.objects.filter(is_active=True)
-        
-        local_folder = settings.WRF_CONFIG['LOCAL_DATA_PATH'] / download_results['run_folder']
-        
-        processed_count = 0
-        total_steps = len(domains) * len(parameters) * 25  # 25 timesteps
+        _download_run(forecast_run, fetch_log, run_datetime)
+        self.update_state(state='PROGRESS', meta={'progress': 30})
         
-        for domain in domains:
-            logger.info(f"  Processing domain: {domain.name}")
-            
-            for parameter in parameters:
-                logger.info(f"    Processing parameter: {parameter.name}")
-                
-                # Track cumulative values for parameters that need it
-                previous_values = None
-                
-                for timestep in range(25):  # 0-72 hours at 3-hour intervals
-                    hour = timestep * 3
-                    
-                    try:
-                        # Construct GRIB file path
-                        domain_suffix = domain.file_suffix
-                        grib_filename = f'WRFPRS_d{domain_suffix}.{hour:02d}'
-                        grib_file = local_folder / grib_filename
-                        
-                        if not grib_file.exists():
-                            logger.warning(f"      ⚠️  File not found: {grib_filename}")
-                            continue
-                        
-                        # Extract data from GRIB
-                        with GRIBProcessor(str(grib_file)) as processor:
-                            data = processor.extract_parameter(
-                                parameter.code,
-                                apply_color_mapping=False
-                            )
-                        
-                        if not data:
-                            logger.warning(f"      ⚠️  No data extracted for {parameter.code}")
-                            continue
-                        
-                        # Get arrays
-                        lats = np.array(data['lats'])
-                        lons = np.array(data['lons'])
-                        values = np.array(data['values'])
-                        
-                        # Apply cumulative/running aggregation
-                        if parameter.code == 'rainfall':
-                            # Rainfall: cumulative sum
-                            if previous_values is None:
-                                previous_values = np.zeros_like(values)
-                            values = previous_values + values
-                            previous_values = values.copy()
-                        
-                        elif parameter.code == 'temp-max':
-                            # Max temperature: running maximum
-                            if previous_values is None:
-                                previous_values = values.copy()
-                            else:
-                                values = np.maximum(previous_values, values)
-                                previous_values = values.copy()
-                        
-                        elif parameter.code == 'temp-min':
-                            # Min temperature: running minimum
-                            if previous_values is None:
-                                previous_values = values.copy()
-                            else:
-                                values = np.minimum(previous_values, values)
-                                previous_values = values.copy()
-                        
-                        # Apply color mapping
-                        mapper = get_mapper_for_parameter(parameter.code)
-                        color_data = mapper.map_grid(values)
-                        
-                        # Calculate statistics
-                        valid_values = values[~np.isnan(values)]
-                        min_val = float(np.min(valid_values)) if len(valid_values) > 0 else None
-                        max_val = float(np.max(valid_values)) if len(valid_values) > 0 else None
-                        mean_val = float(np.mean(valid_values)) if len(valid_values) > 0 else None
-                        
-                        # Calculate valid time
-                        valid_time = timezone.make_aware(
-                            run_datetime + timedelta(hours=hour)
-                        )
-                        
-                        # Save to database
-                        ForecastData.objects.update_or_create(
-                            forecast_run=forecast_run,
-                            domain=domain,
-                            parameter=parameter,
-                            time_step=timestep,
-                            defaults={
-                                'valid_time': valid_time,
-                                'grid_lats': lats.tolist(),
-                                'grid_lons': lons.tolist(),
-                                'values': values.tolist(),
-                                'color_data': color_data,
-                                'min_value': min_val,
-                                'max_value': max_val,
-                                'mean_value': mean_val,
-                                'source_file': grib_filename,
-                            }
-                        )
-                        
-                        processed_count += 1
-                        
-                        # Update progress
-                        progress = 30 + int((processed_count / total_steps) * 70)
-                        forecast_run.progress = progress
-                        forecast_run.save()
-                        
-                        logger.info(f"      ✓ Processed T+{hour}h")
-                    
-                    except Exception as e:
-                        logger.error(f"      ❌ Error processing timestep {hour}h: {e}")
-                        continue
+        domain_ids = list(Domain.objects.filter(is_active=True).values_list('id', flat=True))
+        parameter_ids = list(Parameter.objects.filter(is_active=True).values_list('id', flat=True))
         
-        # Mark as completed
-        forecast_run.status = 'completed'
-        forecast_run.progress = 100
-        forecast_run.completed_at = timezone.now()
-        forecast_run.save()
+        n_pairs = len(domain_ids) * len(parameter_ids)
+        logger.info(f"⚙️  Dispatching {n_pairs} domain/parameter tasks")
         
-        logger.info(f"✅ WRF data fetch completed for {fetch_date}")
-        logger.info(f"   Processed {processed_count} data points")
+        header = [
+            process_domain_param.s(
+                forecast_run.id, domain_id, parameter_id, fetch_date.isoformat(), n_pairs
+            )
+            for domain_id in domain_ids
+            for parameter_id in parameter_ids
+        ]
+        callback = finalize_run.s(forecast_run.id).on_error(
+            fail_run_on_error.s(forecast_run.id, fetch_log.id)
+        )
+        result = chord(header)(callback)
         
         return {
-            'status': 'success',
+            'status': 'processing',
             'date': fetch_date.isoformat(),
             'forecast_run_id': forecast_run.id,
-            'processed_count': processed_count,
-            'message': f'Successfully fetched and processed WRF data for {fetch_date}'
+            'chord_id': result.id,
+            'message': f'Dispatched processing of WRF data for {fetch_date}'
         }
     
     except Exception as e:
         logger.error(f"❌ Error in fetch_wrf_data_task: {e}", exc_info=True)
-        
-        # Update forecast run status
-        if 'forecast_run' in locals():
-            forecast_run.status = 'failed'
-            forecast_run.error_message = str(e)
-            forecast_run.save()
-        
-        # Update fetch log
-        if 'fetch_log' in locals():
-            fetch_log.status = 'failed'
-            fetch_log.error_message = str(e)
-            fetch_log.completed_at = timezone.now()
-            fetch_log.save()
+        _fail_run(forecast_run, fetch_log, e)
         
         # Retry task
         raise self.retry(exc=e, countdown=300)  # Retry after 5 minutes
 
 
+@shared_task(bind=True, max_retries=3)
+def process_domain_param(self, forecast_run_id, domain_id, param_id, fetch_date_iso, n_pairs):
+    """
+    Chord child: process all timesteps for a single (domain, parameter) pair
+    
+    Args:
+        n_pairs: Number of pairs in the chord, for this pair's progress share
+    
+    Returns:
+        int: Number of timesteps processed
+    """
+    from .models import ForecastRun, Domain, Parameter
+    
+    try:
+        forecast_run = ForecastRun.objects.get(id=forecast_run_id)
+        domain = Domain.objects.get(id=domain_id)
+        parameter = Parameter.objects.get(id=param_id)
+        
+        run_datetime = _get_run_datetime(datetime.fromisoformat(fetch_date_iso).date())
+        local_folder = settings.WRF_CONFIG['LOCAL_DATA_PATH'] / run_datetime.strftime('%Y%m%d%H')
+        
+        processed_count = _process_domain_parameter(
+            forecast_run, domain, parameter, local_folder, run_datetime
+        )
+        
+        # Each pair contributes an equal share of the 30-100% processing range
+        forecast_run.add_live_progress(max(1, 70 // max(n_pairs, 1)))
+        
+        return processed_count
+    
+    except Exception as e:
+        logger.error(f"❌ Error processing {domain_id}/{param_id}: {e}", exc_info=True)
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task
+def finalize_run(results, forecast_run_id):
+    """
+    Chord callback: mark the forecast run completed once all pairs are done,
+    then warm the get_data cache for it
+    """
+    from .models import ForecastRun
+    
+    forecast_run = ForecastRun.objects.get(id=forecast_run_id)
+    result = _complete_run(forecast_run, sum(results))
+    prewarm_get_data_cache.delay(forecast_run.run_date.isoformat())
+    return result
+
+
+@shared_task
+def fail_run_on_error(request, exc, traceback, forecast_run_id, fetch_log_id):
+    """
+    Chord errback: mark the run and its fetch log failed when a child task
+    (or finalize_run itself) fails, so the run never sticks in 'processing'
+    """
+    from .models import ForecastRun, DataFetchLog
+    
+    logger.error(f"❌ Forecast run {forecast_run_id} failed: {exc}")
+    _fail_run(
+        ForecastRun.objects.filter(id=forecast_run_id).first(),
+        DataFetchLog.objects.filter(id=fetch_log_id).first(),
+        exc,
+    )
+
+
 @shared_task
 def cleanup_old_data(days_to_keep=7):
     """
@@ -278,17 +451,25 @@ def cleanup_old_data(days_to_keep=7):
         deleted_folders = 0
         
         if data_path.exists():
-            for folder in data_path.iterdir():
-                if folder.is_dir() and len(folder.name) == 10:  # YYYYMMDDHH format
-                    try:
-                        folder_date = datetime.strptime(folder.name[:8], '%Y%m%d').date()
-                        if folder_date < cutoff_date:
-                            import shutil
-                            shutil.rmtree(folder)
-                            deleted_folders += 1
-                            logger.info(f"Deleted old GRIB folder: {folder.name}")
-                    except Exception as e:
-                        logger.warning(f"Error deleting folder {folder.name}: {e}")
+            import shutil
+            
+            # YYYYMMDD prefixes order lexically, so no per-folder strptime
+            cutoff_str = cutoff_date.strftime('%Y%m%d')
+            with os.scandir(data_path) as entries:
+                old_folders = [
+                    entry for entry in entries
+                    if len(entry.name) == 10 and entry.name.isdigit()  # YYYYMMDDHH format
+                    and entry.name[:8] < cutoff_str
+                    and entry.is_dir(follow_symlinks=False)
+                ]
+            
+            for entry in old_folders:
+                try:
+                    shutil.rmtree(entry.path)
+                    deleted_folders += 1
+                    logger.info(f"Deleted old GRIB folder: {entry.name}")
+                except Exception as e:
+                    logger.warning(f"Error deleting folder {entry.name}: {e}")
         
         logger.info(f"✅ Cleanup complete: {count} forecast runs, {deleted_folders} GRIB folders")
         
@@ -304,6 +485,68 @@ def cleanup_old_data(days_to_keep=7):
         raise
 
 
+# Prewarmed get_data entries outlive the on-demand TTL - the run is complete
+PREWARM_CACHE_TIMEOUT = 6 * 3600
+
+
+@shared_task
+def prewarm_get_data_cache(date_str=None, binary=False):
+    """
+    Fill the get_data response cache for every active domain/parameter/timestep
+    
+    Queued by finalize_run once a run completes. Timesteps are the outer
+    loop so the parameters of each GRIB file are served from one download
+    (the view's open-processor cache).
+    
+    Args:
+        date_str: Date string in ISO format (YYYY-MM-DD). If None, uses the
+            latest completed run.
+        binary: Warm the encoding=binary responses instead of the list form
+    """
+    from .models import Domain, Parameter, ForecastRun
+    from .views import ForecastRunViewSet, get_data_cache_key, cache_get_data_response
+    from django.core.cache import cache
+    
+    runs = ForecastRun.objects.filter(status='completed')
+    if date_str:
+        runs = runs.filter(run_date=_parse_fetch_date(date_str))
+    forecast_run = runs.order_by('-run_date', '-run_time').only('run_date').first()
+    if forecast_run is None:
+        logger.info(f"⏭️  No completed run to prewarm for {date_str or 'latest'}")
+        return {'status': 'skipped', 'date': date_str}
+    
+    fetch_date = forecast_run.run_date
+    domains = list(Domain.objects.filter(is_active=True))
+    parameters = list(Parameter.objects.filter(is_active=True))
+    view = ForecastRunViewSet()
+    warmed = skipped = failed = 0
+    
+    for timestep in range(25):
+        for domain in domains:
+            for parameter in parameters:
+                cache_key = get_data_cache_key(fetch_date, domain.code, parameter.code, timestep, binary)
+                if cache.get(cache_key) is not None:
+                    skipped += 1
+                    continue
+                try:
+                    data = view._fetch_and_process(fetch_date, domain, parameter, timestep, binary=binary)
+                    cache_get_data_response(cache_key, data, PREWARM_CACHE_TIMEOUT)
+                    warmed += 1
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"⚠️  Prewarm failed for {cache_key}: {e}")
+    
+    logger.info(f"🔥 Prewarmed get_data cache for {fetch_date}: {warmed} new, {skipped} cached, {failed} failed")
+    
+    return {
+        'status': 'success',
+        'date': fetch_date.isoformat(),
+        'warmed': warmed,
+        'skipped': skipped,
+        'failed': failed,
+    }
+
+
 @shared_task
 def daily_forecast_fetch():
     """
@@ -1,3 +1,324 @@
-from django.test import TestCase
+"""
+Tests for wrf_data
+File: wrf_data/tests.py
+"""
 
-# Create your tests here.
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
+import zlib
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from .models import Domain, Parameter, ForecastData, PACKED_NAN
+from .utils.color_mapper import get_mapper_for_parameter, NAN_INDEX
+from .utils.grib_processor import GRIBProcessor
+from .views import (
+    _bbox_window, _cached_coords, _COORDS_CACHE,
+    _cached_processor, _PROCESSOR_CACHE, _PROCESSOR_CACHE_SIZE,
+    get_data_cache_key, cache_get_data_response,
+)
+
+
+class FakeGribFile:
+    """Rewindable stand-in for an open pygrib file"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def seek(self, offset):
+        pass
+
+    def __iter__(self):
+        return iter(self.messages)
+
+
+class FakeIndex:
+    """Stand-in for pygrib.index keyed on INDEX_KEYS"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def select(self, **key):
+        matches = [
+            msg for msg in self.messages
+            if all(getattr(msg, k) == v for k, v in key.items())
+        ]
+        if not matches:
+            raise ValueError('no matches found')
+        return matches
+
+
+def grib_message(shortName, typeOfLevel, level, name=''):
+    return SimpleNamespace(shortName=shortName, typeOfLevel=typeOfLevel, level=level, name=name)
+
+
+class FindMessageTests(SimpleTestCase):
+    """GRIBProcessor._find_message selection rule"""
+
+    def setUp(self):
+        self.config = GRIBProcessor.PARAMETER_MAPPING['rh']
+        # Same shortName at another level ahead of the configured one
+        self.other_level = grib_message('2r', 'heightAboveGround', 10)
+        self.configured = grib_message('2r', 'heightAboveGround', 2)
+        self.messages = [self.other_level, self.configured]
+
+    def processor(self, messages, indexed):
+        processor = GRIBProcessor('unused.grb2')
+        processor.grib_data = FakeGribFile(messages)
+        processor._index = FakeIndex(messages) if indexed else None
+        return processor
+
+    def test_index_and_scan_pick_the_configured_level(self):
+        for indexed in (True, False):
+            with self.subTest(indexed=indexed):
+                msg = self.processor(self.messages, indexed)._find_message(self.config)
+                self.assertIs(msg, self.configured)
+
+    def test_falls_back_to_first_loose_match(self):
+        first = grib_message('2r', 'heightAboveGround', 10)
+        second = grib_message('x', 'surface', 0, name='2 metre relative humidity')
+        for indexed in (True, False):
+            with self.subTest(indexed=indexed):
+                msg = self.processor([first, second], indexed)._find_message(self.config)
+                self.assertIs(msg, first)
+
+    def test_no_match(self):
+        messages = [grib_message('tp', 'surface', 0, name='Total Precipitation')]
+        self.assertIsNone(self.processor(messages, False)._find_message(self.config))
+
+
+class PackValuesTests(SimpleTestCase):
+    """Parameter.pack_values / unpack_values int16 round trip"""
+
+    def setUp(self):
+        self.parameter = Parameter(code='rainfall', pack_scale=0.05, pack_offset=1600.0)
+
+    def round_trip(self, values):
+        values = np.asarray(values, dtype=np.float32)
+        packed = self.parameter.pack_values(values)
+        return self.parameter.unpack_values(packed, values.shape)
+
+    def test_round_trip_within_half_a_step(self):
+        values = np.array([[0.0, 0.04, 12.3], [250.0, 1000.0, 3000.0]], dtype=np.float32)
+        restored = self.round_trip(values)
+        self.assertEqual(restored.dtype, np.float32)
+        np.testing.assert_allclose(restored, values, atol=self.parameter.pack_scale / 2 + 1e-3)
+
+    def test_nan_cells_survive(self):
+        values = np.array([[1.0, np.nan]], dtype=np.float32)
+        packed = np.frombuffer(self.parameter.pack_values(values), dtype=np.int16)
+        self.assertEqual(packed[1], PACKED_NAN)
+        restored = self.round_trip(values)
+        self.assertTrue(np.isnan(restored[0, 1]))
+        self.assertAlmostEqual(float(restored[0, 0]), 1.0, places=2)
+
+    def test_out_of_range_saturates_and_warns(self):
+        values = np.array([[-1000.0, 1e6]], dtype=np.float32)
+        with self.assertLogs('wrf_data.models', level='WARNING') as logs:
+            restored = self.round_trip(values)
+        self.assertIn('2 cells', logs.output[0])
+        np.testing.assert_allclose(
+            restored[0], [self.parameter.pack_min, self.parameter.pack_max], rtol=1e-5
+        )
+        self.assertFalse(np.isnan(restored).any())
+
+    def test_rainfall_range_covers_72h_totals(self):
+        self.assertLessEqual(self.parameter.pack_min, 0.0)
+        self.assertGreaterEqual(self.parameter.pack_max, 3000.0)
+
+
+class ColorGridTests(SimpleTestCase):
+    """ForecastData.color_grid expands palette indices"""
+
+    def test_matches_map_grid(self):
+        values = np.array([[0.0, 5.0], [30.0, np.nan]], dtype=np.float32)
+        mapper = get_mapper_for_parameter('rainfall')
+        row = ForecastData(
+            parameter=Parameter(code='rainfall'),
+            grid_shape=list(values.shape),
+            color_indices=mapper.map_grid_indices(values).tobytes(),
+        )
+        self.assertEqual(row.color_grid(), mapper.map_grid(values))
+        self.assertEqual(mapper.map_grid_indices(values)[1, 1], NAN_INDEX)
+
+    def test_legacy_rows_fall_back_to_color_data(self):
+        row = ForecastData(parameter=Parameter(code='rainfall'), color_data=[['#fff']])
+        self.assertEqual(row.color_grid(), [['#fff']])
+
+
+class BboxWindowTests(SimpleTestCase):
+    """get_data crops grids to the domain bounding box"""
+
+    def setUp(self):
+        self.lons, self.lats = np.meshgrid(np.arange(30.0, 40.0), np.arange(-5.0, 5.0))
+
+    def test_window_covers_the_box(self):
+        rows, cols = _bbox_window(self.lats, self.lons, (-2.0, 1.0, 33.0, 35.0))
+        self.assertEqual(self.lats[rows, cols].min(), -2.0)
+        self.assertEqual(self.lats[rows, cols].max(), 1.0)
+        self.assertEqual(self.lons[rows, cols].min(), 33.0)
+        self.assertEqual(self.lons[rows, cols].max(), 35.0)
+
+    def test_box_outside_the_grid_keeps_everything(self):
+        window = _bbox_window(self.lats, self.lons, (50.0, 60.0, 0.0, 1.0))
+        self.assertEqual(window, (slice(None), slice(None)))
+
+
+class CoordsCacheTests(SimpleTestCase):
+    """get_data reads a domain grid's coordinates once"""
+
+    def setUp(self):
+        self.lons, self.lats = np.meshgrid(np.arange(30.0, 40.0), np.arange(-5.0, 5.0))
+        _COORDS_CACHE.clear()
+
+    def test_coords_are_read_once_per_grid(self):
+        calls = []
+
+        def read():
+            calls.append(1)
+            return None, self.lats, self.lons, {}
+
+        bbox = (-2.0, 1.0, 33.0, 35.0)
+        key = ('kenya', self.lats.shape, bbox, False)
+        first = _cached_coords(key, read)
+        second = _cached_coords(key, read)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first[0], _bbox_window(self.lats, self.lons, bbox))
+
+
+class FakeProcessor:
+    """GRIBProcessor stand-in that records close()"""
+
+    def __init__(self, data):
+        self.closed = False
+
+    def open(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@mock.patch('wrf_data.utils.grib_processor.GRIBProcessor', FakeProcessor)
+class ProcessorCacheTests(SimpleTestCase):
+    """Evicted processors are closed only once released"""
+
+    def setUp(self):
+        _PROCESSOR_CACHE.clear()
+
+    def fill(self, count):
+        for i in range(count):
+            with _cached_processor(f'other-{i}', lambda path: b''):
+                pass
+
+    def test_eviction_waits_for_the_reader(self):
+        with _cached_processor('held', lambda path: b'') as processor:
+            self.fill(_PROCESSOR_CACHE_SIZE)
+            self.assertNotIn('held', _PROCESSOR_CACHE)
+            self.assertFalse(processor.closed)
+        self.assertTrue(processor.closed)
+
+    def test_idle_entries_close_on_eviction(self):
+        with _cached_processor('idle', lambda path: b'') as processor:
+            pass
+        self.fill(_PROCESSOR_CACHE_SIZE)
+        self.assertTrue(processor.closed)
+
+
+class DeprecatedEndpointTests(SimpleTestCase):
+    """Removed viewsets answer with plain views"""
+
+    def test_forecast_data_is_gone_for_every_method_and_route(self):
+        for path in ('/api/forecast-data/', '/api/forecast-data/42/'):
+            for method in ('get', 'post', 'put', 'delete'):
+                with self.subTest(path=path, method=method):
+                    response = getattr(self.client, method)(path)
+                    self.assertEqual(response.status_code, 410)
+
+    def test_fetch_logs_detail_route(self):
+        response = self.client.get('/api/fetch-logs/7/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('message', response.json())
+
+
+class GetDataCacheTests(TestCase):
+    """get_data cache hits: compressed entry, ETag and 304"""
+
+    def setUp(self):
+        cache.clear()
+        # kenya / rainfall are seeded by create_default_data (post_migrate)
+        self.assertTrue(Domain.objects.filter(code='kenya', is_active=True).exists())
+        self.assertTrue(Parameter.objects.filter(code='rainfall', is_active=True).exists())
+        self.params = {'date': '2026-01-10', 'domain': 'kenya', 'parameter': 'rainfall', 'timestep': '2'}
+        cache_key = get_data_cache_key(date(2026, 1, 10), 'kenya', 'rainfall', 2)
+        self.body, self.etag = cache_get_data_response(cache_key, {'grid_id': 'abc', 'values': [[1, 2]]})
+
+    def get(self, **headers):
+        return self.client.get('/api/forecasts/get_data/', self.params, **headers)
+
+    def test_hit_serves_cached_body(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.body)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_hit_carries_the_entry_etag(self):
+        self.assertEqual(self.get()['ETag'], self.etag)
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response.content, b'')
+
+    def test_stale_etag_gets_the_body(self):
+        response = self.get(HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.body)
+
+    def test_deflate_clients_get_the_stored_bytes(self):
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'deflate')
+        self.assertEqual(zlib.decompress(response.content), self.body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        # Different bytes, different strong validator
+        self.assertNotEqual(response['ETag'], self.etag)
+        revalidated = self.get(HTTP_ACCEPT_ENCODING='deflate', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_refused_deflate_gets_identity(self):
+        for accept in ('gzip, deflate;q=0', '*, deflate;q=0', 'gzip'):
+            with self.subTest(accept=accept):
+                response = self.get(HTTP_ACCEPT_ENCODING=accept)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, self.body)
+                self.assertEqual(response['ETag'], self.etag)
+
+    def test_entry_is_zlib_json(self):
+        cache_key = get_data_cache_key(date(2026, 1, 10), 'kenya', 'rainfall', 2)
+        self.assertEqual(zlib.decompress(cache.get(cache_key)), self.body)
+
+
+class CatalogETagTests(TestCase):
+    """Catalog lists carry an ETag that changes with the catalog"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get('/api/domains/')['ETag']
+        response = self.client.get('/api/domains/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_change_gives_a_new_etag(self):
+        etag = self.client.get('/api/domains/')['ETag']
+        domain = Domain.objects.get(code='kenya')
+        domain.description = 'Updated'
+        domain.save()  # post_save drops the cached catalog
+        response = self.client.get('/api/domains/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
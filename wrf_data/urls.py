@@ -12,8 +12,8 @@ from .views import (
     DomainViewSet,
     ParameterViewSet,
     ForecastRunViewSet,
-    ForecastDataViewSet,
-    DataFetchLogViewSet,
+    forecast_data_deprecated,
+    fetch_logs,
 )
 
 # Create router and register viewsets
@@ -21,12 +21,14 @@ router = DefaultRouter()
 router.register(r'domains', DomainViewSet, basename='domain')
 router.register(r'parameters', ParameterViewSet, basename='parameter')
 router.register(r'forecasts', ForecastRunViewSet, basename='forecast')
-router.register(r'forecast-data', ForecastDataViewSet, basename='forecast-data')
-router.register(r'fetch-logs', DataFetchLogViewSet, basename='fetch-log')
 
 app_name = 'wrf_data'
 
 urlpatterns = [
     path('', include(router.urls)),
     path('ping/', ping, name='ping'),
+    path('forecast-data/', forecast_data_deprecated, name='forecast-data-list'),
+    path('forecast-data/<str:pk>/', forecast_data_deprecated, name='forecast-data-detail'),
+    path('fetch-logs/', fetch_logs, name='fetch-log-list'),
+    path('fetch-logs/<str:pk>/', fetch_logs, name='fetch-log-detail'),
 ]
\ No newline at end of file
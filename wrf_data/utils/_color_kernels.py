@@ -0,0 +1,53 @@
+"""
+Optional Numba kernels for color mapping
+File: wrf_data/utils/_color_kernels.py
+
+numba is not a hard dependency - when it is missing, HAVE_NUMBA is False and
+ColorMapper falls back to np.searchsorted.
+"""
+
+import math
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    # No fastmath: it lets LLVM assume NaN never occurs, which breaks isnan()
+    @njit(cache=True, parallel=True, boundscheck=False)
+    def bin_index_kernel(values, edges, out):
+        """
+        Write the bin index of every cell into out (uint8, 255 for NaN)
+
+        Same result as searchsorted(edges, v, 'right') - 1 clipped to
+        [0, len(edges) - 1], fused into a single pass over the grid.
+        """
+        H, W = values.shape
+        B = edges.shape[0] - 1
+        for i in prange(H):
+            for j in range(W):
+                v = values[i, j]
+                if math.isnan(v):
+                    out[i, j] = 255
+                    continue
+                # Linear scan beats binary search for the <= 10 bins we use
+                k = 0
+                while k < B and v >= edges[k + 1]:
+                    k += 1
+                out[i, j] = k
+
+    # Warm-up compile (cached on disk after the first run)
+    try:
+        bin_index_kernel(
+            np.zeros((1, 1)), np.array([0.0, 1.0]), np.empty((1, 1), np.uint8)
+        )
+    except Exception as e:
+        logger.warning(f"Numba color kernel unavailable, using numpy: {e}")
+        HAVE_NUMBA = False
@@ -7,13 +7,29 @@ Based on operational standard:
 - Rainfall: 0mm = WHITE (no rain), then colored bins
 - Temperatures: All regions have color (no zero temps in Kenya)
 - Exact RGB values from official standard
+
+Single source of truth for color scales: Parameter.color_scale defaults are
+seeded from the get_*_mapper functions below.
 """
 
+import functools
 import numpy as np
 from typing import List, Dict, Any
 
+from ._color_kernels import HAVE_NUMBA
+
 
 TRANSPARENT = 'rgba(0,0,0,0)'
+NAN_INDEX = 255  # map_grid_indices value for missing cells
+NUMBA_MIN_CELLS = 50_000  # Below this the JIT call overhead isn't worth it
+
+
+def _as_float_grid(values) -> np.ndarray:
+    """Float ndarray view of a grid (float32/float64 arrays pass through uncopied)"""
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    return values
 
 
 class ColorMapper:
@@ -22,68 +38,115 @@ class ColorMapper:
     """
 
     def __init__(self, color_scale: List[Dict[str, Any]]):
-        self.color_scale = sorted(color_scale, key=lambda x: x['min'])
+        # Mappers are shared via lru_cache, so the scale and lookup tables are frozen
+        self.color_scale = tuple(sorted(color_scale, key=lambda x: x['min']))
+
+        # Scale as parallel arrays (SoA) for vectorized and scalar lookups.
+        # _edges is the mins plus the last max; the trailing duplicate color
+        # covers values >= the last bin's max.
+        n_bins = len(self.color_scale)
+        self._mins = np.fromiter((item['min'] for item in self.color_scale), dtype=np.float64, count=n_bins)
+        self._maxs = np.fromiter((item['max'] for item in self.color_scale), dtype=np.float64, count=n_bins)
+        self._edges = np.append(self._mins, self._maxs[-1])
+        self._colors = np.array(
+            [item['color'] for item in self.color_scale] + [self.color_scale[-1]['color']],
+            dtype=object
+        )
+        # Colors addressed by every possible uint8 index: NAN_INDEX (and any
+        # unused slot) is transparent, so map_grid is one take over the indices
+        self._index_lut = np.full(NAN_INDEX + 1, TRANSPARENT, dtype=object)
+        self._index_lut[:len(self._colors)] = self._colors
+        for arr in (self._mins, self._maxs, self._edges, self._colors, self._index_lut):
+            arr.setflags(write=False)
+
+        # rgba lookup tables keyed by alpha; last slot is the NaN sentinel
+        self._rgba_cache: Dict[float, np.ndarray] = {}
+
+    def _bin_indices(self, values: np.ndarray) -> np.ndarray:
+        """
+        Index into self._colors for every cell (NaN cells must be masked by caller)
+        """
+        idx = np.searchsorted(self._edges, values, side='right') - 1
+        return np.clip(idx, 0, len(self._colors) - 1)
 
     def map_value(self, value: float) -> str:
         """
         Map a single value to hex color
         """
-        if value is None or np.isnan(value):
+        if value is None or value != value:  # NaN != NaN
             return TRANSPARENT
 
-        # Find the appropriate bin
-        for item in self.color_scale:
-            if item['min'] <= value < item['max']:
-                return item['color']
-
-        # If above all bins, use last color
-        if value >= self.color_scale[-1]['max']:
-            return self.color_scale[-1]['color']
-        
-        # If below all bins, use first color
-        return self.color_scale[0]['color']
+        # Below all bins -> first color, >= last max -> last color
+        return self._colors[int(self._bin_indices(value))]
 
     def map_grid(self, values: np.ndarray) -> List[List[str]]:
         """
         Map entire grid to colors
+        
+        Bins through map_grid_indices (the fused Numba kernel on large grids),
+        then looks the colors up in one pass.
         """
-        rows, cols = values.shape
-        return [
-            [self.map_value(values[i, j]) for j in range(cols)]
-            for i in range(rows)
-        ]
+        return self.colors_for_indices(self.map_grid_indices(values))
 
-    def map_grid_with_alpha(self, values: np.ndarray, alpha: float = 0.8) -> List[List[str]]:
+    def colors_for_indices(self, indices: np.ndarray) -> List[List[str]]:
         """
-        Map grid with transparency (for layered maps)
+        Expand palette indices from map_grid_indices back to a color grid
         """
-        rows, cols = values.shape
-        grid = []
+        return self._index_lut[indices].tolist()
 
-        for i in range(rows):
-            row = []
-            for j in range(cols):
-                v = values[i, j]
+    def map_grid_indices(self, values: np.ndarray) -> np.ndarray:
+        """
+        Map entire grid to palette indices (uint8, NAN_INDEX for missing cells)
 
-                if v is None or np.isnan(v):
-                    row.append(TRANSPARENT)
-                else:
-                    hex_color = self.map_value(v)
-                    if hex_color == TRANSPARENT:
-                        row.append(TRANSPARENT)
-                    else:
-                        row.append(self._hex_to_rgba(hex_color, alpha))
-            grid.append(row)
+        Pair with palette() so the client does the color lookup - one byte per
+        cell instead of a color string.
+        """
+        values = _as_float_grid(values)
+
+        if HAVE_NUMBA and values.ndim == 2 and values.size > NUMBA_MIN_CELLS:
+            from ._color_kernels import bin_index_kernel
+            idx = np.empty(values.shape, dtype=np.uint8)
+            bin_index_kernel(np.ascontiguousarray(values), self._edges, idx)
+            return idx
 
-        return grid
+        idx = self._bin_indices(values).astype(np.uint8)
+        idx[np.isnan(values)] = NAN_INDEX
+        return idx
+
+    def palette(self) -> List[str]:
+        """
+        Colors addressed by map_grid_indices
+        """
+        return self._colors.tolist()
+
+    def map_grid_with_alpha(self, values: np.ndarray, alpha: float = 0.8) -> List[List[str]]:
+        """
+        Map grid with transparency (for layered maps)
+        """
+        values = _as_float_grid(values)
+        rgba_colors = self._rgba_array_for_alpha(alpha)
+        idx = self._bin_indices(values)
+        idx[np.isnan(values)] = len(rgba_colors) - 1
+        return rgba_colors[idx].tolist()
+
+    def _rgba_array_for_alpha(self, alpha: float) -> np.ndarray:
+        """
+        rgba strings for every bin at the given alpha, built once per alpha
+        """
+        rgba_colors = self._rgba_cache.get(alpha)
+        if rgba_colors is None:
+            rgba_colors = np.array(
+                [self._hex_to_rgba(color, alpha) for color in self._colors] + [TRANSPARENT],
+                dtype=object
+            )
+            self._rgba_cache[alpha] = rgba_colors
+        return rgba_colors
 
     @staticmethod
-    def _hex_to_rgba(hex_color: str, alpha: float) -> str:
-        """Convert hex color to rgba with alpha"""
-        hex_color = hex_color.lstrip('#')
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
+    @functools.lru_cache(maxsize=256)
+    def _hex_to_rgba(hex_color: str, alpha: float = 1.0) -> str:
+        """Convert hex color to rgba with alpha (memoized per color/alpha)"""
+        r, g, b = bytes.fromhex(hex_color.lstrip('#'))
         return f'rgba({r},{g},{b},{alpha})'
 
     def get_legend_items(self) -> List[Dict[str, Any]]:
@@ -105,6 +168,7 @@ class ColorMapper:
 # RAINFALL – OFFICIAL KMD STANDARD (from your image)
 # ============================================================
 
+@functools.lru_cache(maxsize=None)
 def get_rainfall_mapper() -> ColorMapper:
     """
     Official KMD rainfall color scale
@@ -130,6 +194,7 @@ def get_rainfall_mapper() -> ColorMapper:
 # TEMPERATURE MAX – OFFICIAL KMD STANDARD
 # ============================================================
 
+@functools.lru_cache(maxsize=None)
 def get_temp_max_mapper() -> ColorMapper:
     """
     Official KMD maximum temperature color scale
@@ -153,6 +218,7 @@ def get_temp_max_mapper() -> ColorMapper:
 # TEMPERATURE MIN – OFFICIAL KMD STANDARD
 # ============================================================
 
+@functools.lru_cache(maxsize=None)
 def get_temp_min_mapper() -> ColorMapper:
     """
     Official KMD minimum temperature color scale
@@ -176,6 +242,7 @@ def get_temp_min_mapper() -> ColorMapper:
 # RELATIVE HUMIDITY (Generic - not in your image)
 # ============================================================
 
+@functools.lru_cache(maxsize=None)
 def get_rh_mapper() -> ColorMapper:
     """
     Relative humidity color scale
@@ -195,6 +262,7 @@ def get_rh_mapper() -> ColorMapper:
 # CAPE (Generic - not in your image)
 # ============================================================
 
+@functools.lru_cache(maxsize=None)
 def get_cape_mapper() -> ColorMapper:
     """
     CAPE (Convective Available Potential Energy) color scale
@@ -215,6 +283,7 @@ def get_cape_mapper() -> ColorMapper:
 # PARAMETER ROUTER
 # ============================================================
 
+@functools.lru_cache(maxsize=None)
 def get_mapper_for_parameter(parameter_code: str) -> ColorMapper:
     """
     Get the appropriate color mapper for a parameter
@@ -5,9 +5,14 @@ File: wrf_data/utils/grib_processor.py
 """
 
 import os
+import base64
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pygrib
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union, BinaryIO
 import logging
 from datetime import datetime, timedelta
 
@@ -15,6 +20,26 @@ from .color_mapper import get_mapper_for_parameter
 
 logger = logging.getLogger(__name__)
 
+# RAM-backed scratch space for GRIB buffers (pygrib can only open paths)
+SCRATCH_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Message lookup keys for the pygrib index
+INDEX_KEYS = ('shortName', 'typeOfLevel', 'level')
+
+
+def _index_path(grib_path: str) -> Optional[str]:
+    """
+    Where the persisted index of grib_path lives: `<file>.<hash>.idx`, with the
+    hash covering the index keys and the file's size/mtime so a re-downloaded
+    file never picks up a stale index
+    """
+    try:
+        stat = os.stat(grib_path)
+    except OSError:
+        return None
+    key = f"{','.join(INDEX_KEYS)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return f"{grib_path}.{hashlib.sha1(key.encode()).hexdigest()[:8]}.idx"
+
 
 class GRIBProcessor:
     """
@@ -57,30 +82,106 @@ class GRIBProcessor:
         },
     }
     
-    def __init__(self, grib_file_path: str):
+    def __init__(self, grib_source: Union[str, bytes, BinaryIO]):
         """
         Initialize GRIB processor
         
         Args:
-            grib_file_path: Path to GRIB file
+            grib_source: Path to GRIB file, or the raw GRIB bytes / a binary
+                file-like object (e.g. streamed straight from SFTP)
         """
-        self.grib_file_path = grib_file_path
+        self.grib_buffer = None
+        self.grib_file_path = None
+        self._scratch_path = None
+        
+        if isinstance(grib_source, (bytes, bytearray, memoryview)):
+            self.grib_buffer = grib_source
+        elif hasattr(grib_source, 'read'):
+            self.grib_buffer = grib_source.read()
+        else:
+            self.grib_file_path = grib_source
+        
         self.grib_data = None
+        self._index = None
+        self._latlons = {}
     
     def open(self):
-        """Open the GRIB file"""
+        """Open the GRIB file (in-memory buffers are exposed via tmpfs)"""
         try:
+            if self.grib_buffer is not None and self._scratch_path is None:
+                fd, self._scratch_path = tempfile.mkstemp(
+                    prefix='wrf_grib_', suffix='.grb2', dir=SCRATCH_DIR
+                )
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(self.grib_buffer)
+                self.grib_file_path = self._scratch_path
+                # The tmpfs copy holds the data now - don't keep it twice
+                # while the processor stays open
+                self.grib_buffer = None
+            
             self.grib_data = pygrib.open(self.grib_file_path)
+            try:
+                self._index = self._open_index()
+            except Exception as e:
+                logger.debug(f"No GRIB index for {self.grib_file_path}, scanning instead: {e}")
+                self._index = None
             logger.info(f"Opened GRIB file: {self.grib_file_path}")
         except Exception as e:
             logger.error(f"Failed to open GRIB file {self.grib_file_path}: {e}")
+            self._remove_scratch()
             raise
     
+    def _open_index(self):
+        """
+        Build the pygrib index, or reload it from disk
+        
+        On-disk files are opened once per parameter by the Celery tasks, so the
+        index is saved next to the file and later opens skip the full message
+        scan. Scratch copies of in-memory buffers are indexed once and not saved.
+        """
+        idx_path = None if self._scratch_path else _index_path(self.grib_file_path)
+        
+        if idx_path and os.path.exists(idx_path):
+            try:
+                return pygrib.index(idx_path)
+            except Exception as e:
+                logger.debug(f"Ignoring unreadable GRIB index {idx_path}: {e}")
+        
+        index = pygrib.index(self.grib_file_path, *INDEX_KEYS)
+        
+        if idx_path:
+            # Write then rename: parallel workers may index the same file
+            tmp_path = f"{idx_path}.{os.getpid()}.tmp"
+            try:
+                index.write(tmp_path)
+                os.replace(tmp_path, idx_path)
+            except Exception as e:
+                logger.debug(f"Could not save GRIB index {idx_path}: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        
+        return index
+    
     def close(self):
         """Close the GRIB file"""
+        if self._index is not None:
+            self._index.close()
+            self._index = None
         if self.grib_data:
             self.grib_data.close()
             self.grib_data = None
+        self._remove_scratch()
+    
+    def _remove_scratch(self):
+        """Delete the tmpfs copy of an in-memory buffer, if any"""
+        if self._scratch_path:
+            try:
+                os.remove(self._scratch_path)
+            except OSError:
+                pass
+            self._scratch_path = None
     
     def __enter__(self):
         """Context manager entry"""
@@ -94,7 +195,9 @@ class GRIBProcessor:
     def extract_parameter(
         self, 
         parameter_code: str,
-        apply_color_mapping: bool = True
+        apply_color_mapping: bool = True,
+        legacy_color_data: bool = False,
+        binary: bool = False
     ) -> Optional[Dict]:
         """
         Extract a specific parameter from the GRIB file
@@ -102,9 +205,89 @@ class GRIBProcessor:
         Args:
             parameter_code: Parameter code ('rainfall', 'temp-max', etc.)
             apply_color_mapping: Whether to apply color mapping
+            legacy_color_data: Also include the per-cell hex 'color_data' grid
+            binary: Return grids as base64 float32 ('lats_b64', 'lons_b64',
+                'values_b64' + 'shape') instead of nested lists
+            
+        Returns:
+            Dict with 'lats', 'lons', 'values', 'metadata' and, when color
+            mapping is applied, 'color_indices' + 'palette' (and 'color_data')
+        """
+        extracted = self.read_arrays(parameter_code)
+        if extracted is None:
+            return None
+        
+        values, lats, lons, metadata = extracted
+        
+        try:
+            result = _grid_payload(lats, lons, values, binary)
+            result['metadata'] = metadata
+            
+            # Apply color mapping if requested
+            if apply_color_mapping:
+                mapper = get_mapper_for_parameter(parameter_code)
+                result['color_indices'] = mapper.map_grid_indices(values).tolist()
+                result['palette'] = mapper.palette()
+                if legacy_color_data:
+                    result['color_data'] = mapper.map_grid(values)
+            
+            logger.info(f"Extracted {parameter_code}: {metadata}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error extracting parameter {parameter_code}: {e}")
+            return None
+    
+    def _find_message(self, param_config: Dict):
+        """
+        The message for a parameter config
+        
+        Selection rule (index and scan agree): the message matching the
+        config's (shortName, typeOfLevel, level), which is unique in WRF
+        post-processed files; only when there is none, the first message in
+        file order whose shortName or name matches (the original loose rule).
+        """
+        key = {k: param_config[k] for k in INDEX_KEYS}
+        
+        if self._index is not None:
+            try:
+                matches = self._index.select(**key)
+            except (ValueError, IndexError):
+                matches = []
+            if len(matches) > 1:
+                logger.warning(f"{len(matches)} GRIB messages for {key}, using the first")
+            if matches:
+                return matches[0]
+        
+        # pygrib iterators are single-shot - rewind for every lookup
+        self.grib_data.seek(0)
+        loose_match = None
+        for msg in self.grib_data:
+            if all(getattr(msg, k, None) == v for k, v in key.items()):
+                return msg
+            # Try multiple matching strategies
+            if loose_match is None and (
+                (hasattr(msg, 'shortName') and msg.shortName == param_config.get('shortName')) or
+                (hasattr(msg, 'name') and param_config['name'] in msg.name)
+            ):
+                loose_match = msg
+        return loose_match
+    
+    def read_arrays(
+        self,
+        parameter_code: str,
+        include_coords: bool = True
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict]]:
+        """
+        Read a parameter as numpy arrays (no list conversion)
+        
+        Args:
+            parameter_code: Parameter code ('rainfall', 'temp-max', etc.)
+            include_coords: Decode lat/lons too; pass False when the caller
+                already has the domain grid (lats/lons are then None)
             
         Returns:
-            Dict with 'lats', 'lons', 'values', 'color_data', 'metadata'
+            Tuple of (values, lats, lons, metadata), or None if not found
         """
         if not self.grib_data:
             raise ValueError("GRIB file not opened. Call open() first.")
@@ -119,55 +302,57 @@ class GRIBProcessor:
             # Note: GRIB variable names may vary depending on WRF configuration
             # You may need to adjust these based on your actual GRIB files
             
-            messages = []
-            for msg in self.grib_data:
-                # Try multiple matching strategies
-                if (hasattr(msg, 'shortName') and msg.shortName == param_config.get('shortName')) or \
-                   (hasattr(msg, 'name') and param_config['name'] in msg.name):
-                    messages.append(msg)
+            msg = self._find_message(param_config)
             
-            if not messages:
+            if msg is None:
                 logger.warning(f"No messages found for parameter {parameter_code}")
                 return None
             
-            # Use the first matching message (or aggregate if needed)
-            msg = messages[0]
-            
             # Extract data
-            values = msg.values
-            lats, lons = msg.latlons()
+            # float32 halves memory traffic for every later pass (values are
+            # stored int16-packed anyway); masked points become NaN. One
+            # float32 copy - np.ma.filled would copy the cast array again.
+            raw = msg.values
+            values = np.array(np.ma.getdata(raw), dtype=np.float32)
+            mask = np.ma.getmask(raw)
+            if mask is not np.ma.nomask:
+                values[mask] = np.nan
+            
+            # All messages in a WRF file share one grid - decode lat/lons once
+            lats = lons = None
+            if include_coords:
+                if values.shape not in self._latlons:
+                    self._latlons[values.shape] = msg.latlons()
+                lats, lons = self._latlons[values.shape]
             
-            # Convert temperature from Kelvin to Celsius if needed
+            # Statistics via nan-aware reductions (no boolean-mask copy)
+            try:
+                vmax = float(np.nanmax(values))
+            except ValueError:  # empty grid
+                vmax = float('nan')
+            
+            # Convert temperature from Kelvin to Celsius if needed (in place)
             if parameter_code in ['temp-max', 'temp-min']:
-                if values.max() > 200:  # Likely in Kelvin
-                    values = values - 273.15
+                if vmax > 200:  # Likely in Kelvin
+                    np.subtract(values, 273.15, out=values)
+                    vmax -= 273.15
+            
+            if np.isnan(vmax):  # all-NaN grid
+                vmin = vmax = vmean = None
+            else:
+                vmin = float(np.nanmin(values))
+                vmean = float(np.nanmean(values))
             
-            # Calculate statistics
-            valid_values = values[~np.isnan(values)]
             metadata = {
-                'min': float(np.min(valid_values)) if len(valid_values) > 0 else None,
-                'max': float(np.max(valid_values)) if len(valid_values) > 0 else None,
-                'mean': float(np.mean(valid_values)) if len(valid_values) > 0 else None,
+                'min': vmin,
+                'max': vmax,
+                'mean': vmean,
                 'units': getattr(msg, 'units', 'unknown'),
                 'valid_time': msg.validDate if hasattr(msg, 'validDate') else None,
                 'forecast_time': msg.forecastTime if hasattr(msg, 'forecastTime') else None,
             }
             
-            result = {
-                'lats': lats.tolist(),
-                'lons': lons.tolist(),
-                'values': values.tolist(),
-                'metadata': metadata,
-            }
-            
-            # Apply color mapping if requested
-            if apply_color_mapping:
-                mapper = get_mapper_for_parameter(parameter_code)
-                color_data = mapper.map_grid(values)
-                result['color_data'] = color_data
-            
-            logger.info(f"Extracted {parameter_code}: {metadata}")
-            return result
+            return values, lats, lons, metadata
             
         except Exception as e:
             logger.error(f"Error extracting parameter {parameter_code}: {e}")
@@ -215,13 +400,93 @@ class GRIBProcessor:
         
         return messages
 
+def decode_grib_file(
+    file_path: Union[str, bytes],
+    parameter_codes: List[str]
+) -> Dict[str, Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict]]]:
+    """
+    Decode several parameters from one GRIB file
+    Top-level (and Django-free) so it can run in a worker process.
+    
+    Args:
+        file_path: Local path, or the raw GRIB bytes of a streamed file
+        parameter_codes: Parameter codes to extract
+    
+    Returns:
+        Dict mapping parameter code to read_arrays() output (or None)
+    """
+    with GRIBProcessor(file_path) as processor:
+        return {code: processor.read_arrays(code) for code in parameter_codes}
+
+
+def _encode_f32(a: np.ndarray) -> str:
+    """Base64-encode an array as contiguous little-endian float32"""
+    return base64.b64encode(np.ascontiguousarray(a, dtype='<f4').tobytes()).decode('ascii')
+
+
+def _coords_payload(lats: np.ndarray, lons: np.ndarray, binary: bool) -> Dict:
+    """Lat/lon arrays as nested lists, or base64 float32 buffers when binary=True"""
+    if binary:
+        return {
+            'lats_b64': _encode_f32(lats),
+            'lons_b64': _encode_f32(lons),
+            'shape': list(lats.shape),
+        }
+    return {
+        'lats': lats.tolist(),
+        'lons': lons.tolist(),
+    }
+
+
+def _values_payload(values: np.ndarray, binary: bool) -> Dict:
+    """Value array as a nested list, or a base64 float32 buffer when binary=True"""
+    if binary:
+        return {
+            'values_b64': _encode_f32(values),
+            'shape': list(values.shape),
+        }
+    return {'values': values.tolist()}
+
+
+def _grid_payload(lats: np.ndarray, lons: np.ndarray, values: np.ndarray, binary: bool) -> Dict:
+    """Coordinates + values for a single grid"""
+    return {**_coords_payload(lats, lons, binary), **_values_payload(values, binary)}
+
+
+# Encoded lat/lon payloads keyed by grid_id - every file of a domain shares one grid
+_GRID_CACHE: Dict[Tuple[str, bool], Dict] = {}
+_GRID_CACHE_SIZE = 8
+
+
+def _shared_grid(domain: str, lats: np.ndarray, lons: np.ndarray, binary: bool) -> Tuple[str, Dict]:
+    """
+    Encoded coordinates for a domain grid, built once per (domain, shape)
+    
+    Returns:
+        Tuple of (grid_id, payload)
+    """
+    rows, cols = lats.shape
+    grid_id = f"{domain}:{rows}x{cols}"
+    key = (grid_id, binary)
+    
+    payload = _GRID_CACHE.get(key)
+    if payload is None:
+        if len(_GRID_CACHE) >= _GRID_CACHE_SIZE:
+            _GRID_CACHE.pop(next(iter(_GRID_CACHE)))
+        payload = _GRID_CACHE[key] = _coords_payload(lats, lons, binary)
+    
+    return grid_id, payload
+
+
 def _process_grib_file(
     file_path: str,
     domain: str,
     parameters: Optional[List[str]] = None,
     subsample_factor: int = 4,
     apply_color_mapping: bool = True,
-    previous_step_data: Optional[Dict[str, np.ndarray]] = None
+    previous_step_data: Optional[Dict[str, np.ndarray]] = None,
+    legacy_color_data: bool = False,
+    binary: bool = False
 ) -> Dict:
     """
     Internal helper: process a single GRIB file, applying cumulative/running aggregation.
@@ -237,50 +502,55 @@ def _process_grib_file(
     result = {
         'file_path': file_path,
         'domain': domain,
+        'grids': {},  # grid_id -> lat/lon payload, shared by all parameters
         'parameters': {}
     }
 
     try:
         with GRIBProcessor(file_path) as processor:
             for param in parameters:
-                data = processor.extract_parameter(param, apply_color_mapping=apply_color_mapping)
-                if not data:
+                extracted = processor.read_arrays(param)
+                if extracted is None:
                     continue
 
-                values = np.array(data['values'])
-
-                # Initialize previous step values if not present
-                if param not in previous_step_data:
-                    previous_step_data[param] = np.zeros_like(values) if param == 'rainfall' else values
+                values, lats, lons, metadata = extracted
 
-                # Apply parameter-specific aggregation
-                if param == 'rainfall':
-                    values = previous_step_data[param] + values
-                elif param == 'temp-max':
-                    values = np.maximum(previous_step_data[param], values)
-                elif param == 'temp-min':
-                    values = np.minimum(previous_step_data[param], values)
-                elif param == 'cape':
-                    values = np.maximum(previous_step_data.get(param, values), values)
-                # RH stays instantaneous
+                # Apply parameter-specific aggregation in place on the running
+                # buffer (the first step is its own running sum/max/min)
+                prev = previous_step_data.get(param)
+                if prev is not None:
+                    if param == 'rainfall':
+                        np.add(prev, values, out=prev)
+                    elif param in ('temp-max', 'cape'):
+                        np.maximum(prev, values, out=prev)
+                    elif param == 'temp-min':
+                        np.minimum(prev, values, out=prev)
+                    else:
+                        prev = values  # RH stays instantaneous
+                    values = prev
 
                 # Update previous_step_data for next step
                 previous_step_data[param] = values
 
                 # Subsample for frontend efficiency
-                lats, lons = np.array(data['lats']), np.array(data['lons'])
                 lats_sub, lons_sub, values_sub = lats[::subsample_factor, ::subsample_factor], \
                                                  lons[::subsample_factor, ::subsample_factor], \
                                                  values[::subsample_factor, ::subsample_factor]
 
-                data['lats'] = lats_sub.tolist()
-                data['lons'] = lons_sub.tolist()
-                data['values'] = values_sub.tolist()
+                grid_id, grid = _shared_grid(domain, lats_sub, lons_sub, binary)
+                result['grids'][grid_id] = grid
+
+                data = _values_payload(values_sub, binary)
+                data['grid_id'] = grid_id
+                data['metadata'] = metadata
 
-                # Update color mapping if applied
+                # Color mapping on the aggregated values
                 if apply_color_mapping:
                     mapper = get_mapper_for_parameter(param)
-                    data['color_data'] = mapper.map_grid(values)
+                    data['color_indices'] = mapper.map_grid_indices(values_sub).tolist()
+                    data['palette'] = mapper.palette()
+                    if legacy_color_data:
+                        data['color_data'] = mapper.map_grid(values_sub)
 
                 result['parameters'][param] = data
 
@@ -290,6 +560,82 @@ def _process_grib_file(
     return result
 
 
+def _decode_f32(data: str, shape: List[int]) -> np.ndarray:
+    """Inverse of _encode_f32"""
+    return np.frombuffer(base64.b64decode(data), dtype='<f4').reshape(shape)
+
+
+def _grid_array(payload: Dict, key: str) -> np.ndarray:
+    """A grid from a list or binary (base64) payload, as float32"""
+    if f'{key}_b64' in payload:
+        return _decode_f32(payload[f'{key}_b64'], payload['shape'])
+    return np.asarray(payload[key], dtype=np.float32)
+
+
+def result_to_npz(path: str, result: Dict) -> None:
+    """
+    Save a _process_grib_file result as a compressed .npz
+    
+    Grids are stored as float32 and color indices as uint8, which is far
+    smaller and faster to reload than the JSON-friendly lists.
+    
+    Args:
+        path: Destination .npz path
+        result: Output of process_wrf_file / _process_grib_file
+    """
+    arrays = {
+        'file_path': np.array(result['file_path']),
+        'domain': np.array(result['domain']),
+    }
+    
+    for grid_id, grid in result.get('grids', {}).items():
+        arrays[f'grids/{grid_id}/lats'] = _grid_array(grid, 'lats')
+        arrays[f'grids/{grid_id}/lons'] = _grid_array(grid, 'lons')
+    
+    for param, data in result['parameters'].items():
+        arrays[f'{param}/values'] = _grid_array(data, 'values')
+        arrays[f'{param}/grid_id'] = np.array(data['grid_id'])
+        if 'color_indices' in data:
+            arrays[f'{param}/color_idx'] = np.asarray(data['color_indices'], dtype=np.uint8)
+            arrays[f'{param}/palette'] = np.array(data['palette'])
+    
+    np.savez_compressed(path, **arrays)
+
+
+def result_from_npz(path: str) -> Dict:
+    """
+    Load a result saved by result_to_npz
+    
+    Returns:
+        Dict shaped like the _process_grib_file result, holding numpy arrays
+        ('lats', 'lons', 'values', 'color_indices') instead of lists
+    """
+    result = {'grids': {}, 'parameters': {}}
+    
+    with np.load(path) as npz:
+        result['file_path'] = str(npz['file_path'])
+        result['domain'] = str(npz['domain'])
+        
+        for name in npz.files:
+            parts = name.split('/')
+            if parts[0] == 'grids':
+                grid = result['grids'].setdefault(parts[1], {})
+                grid[parts[2]] = npz[name]
+            elif len(parts) == 2:
+                param, field = parts
+                data = result['parameters'].setdefault(param, {})
+                if field == 'values':
+                    data['values'] = npz[name]
+                elif field == 'grid_id':
+                    data['grid_id'] = str(npz[name])
+                elif field == 'color_idx':
+                    data['color_indices'] = npz[name]
+                elif field == 'palette':
+                    data['palette'] = npz[name].tolist()
+    
+    return result
+
+
 def process_wrf_file(
     file_path: str,
     domain: str,
@@ -322,21 +668,39 @@ def process_grib_folder(
     domain: str,
     parameters: Optional[List[str]] = None,
     subsample_factor: int = 4,
-    apply_color_mapping: bool = True
+    apply_color_mapping: bool = True,
+    max_workers: Optional[int] = None
 ) -> List[Dict]:
     """
     Public function to batch process all GRIB files in a folder.
+    Files are independent, so they are decoded in parallel worker processes.
     """
-    results = []
-    for file in os.listdir(folder_path):
-        if not file.startswith('wrfout_'):
-            continue
-        file_path = os.path.join(folder_path, file)
-        results.append(_process_grib_file(
-            file_path=file_path,
-            domain=domain,
-            parameters=parameters,
-            subsample_factor=subsample_factor,
-            apply_color_mapping=apply_color_mapping
-        ))
-    return results
+    with os.scandir(folder_path) as entries:
+        files = sorted(
+            entry.path for entry in entries
+            if entry.name.startswith('wrfout_') and entry.is_file()
+        )
+    if not files:
+        return []
+
+    # Callers run inside Django/Celery with live DB and SSH threads; forking
+    # with their locks held can deadlock the workers, so start them clean
+    start_methods = multiprocessing.get_all_start_methods()
+    mp_context = multiprocessing.get_context(
+        'forkserver' if 'forkserver' in start_methods else 'spawn'
+    )
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             mp_context=mp_context) as executor:
+        futures = [
+            executor.submit(
+                _process_grib_file,
+                file_path=file_path,
+                domain=domain,
+                parameters=parameters,
+                subsample_factor=subsample_factor,
+                apply_color_mapping=apply_color_mapping
+            )
+            for file_path in files
+        ]
+        return [future.result() for future in futures]
@@ -6,17 +6,126 @@ File: wrf_data/utils/ssh_fetcher.py
 
 import paramiko
 import os
+import functools
+import re
 import base64
 import io
+import random
+import socket
 from datetime import datetime, timedelta
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, KeysView
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 import time
+import threading
+import queue
+import heapq
+import shlex
+import shutil
+import subprocess
+import tarfile
+import tempfile
 
 logger = logging.getLogger(__name__)
 
 
+# WRFPRS_d01.XX (Kenya) / WRFPRS_d02.XX (East Africa)
+# Groups: domain file suffix ('01'/'02'), forecast hour
+GRIB_FILENAME_RE = re.compile(r'WRFPRS_d(\d{2})\.(\d{1,3})')
+DOMAIN_FILE_SUFFIXES = {'kenya': '01', 'east-africa': '02'}
+SUFFIX_DOMAINS = {suffix: code for code, suffix in DOMAIN_FILE_SUFFIXES.items()}
+
+# 'paramiko' (in-process SFTP) or 'openssh' (native sftp client subprocess)
+TRANSFER_BACKENDS = ('paramiko', 'openssh')
+
+KEEPALIVE_INTERVAL = 30  # seconds
+MAX_RETRY_WAIT = 30  # seconds, cap for exponential backoff
+REKEY_BYTES = 1 << 32  # paramiko rekeys every 512 MiB by default; 4 GiB per key here
+RETRY_BUDGET = 60  # seconds, total time download_file may spend retrying
+
+# Transient transport failures worth another attempt; anything else (missing
+# file, permissions, auth) fails the same way every time
+RETRYABLE_ERRORS = (socket.timeout, EOFError, ConnectionError, paramiko.SSHException)
+
+
+# PEM header / OpenSSH key-type marker -> paramiko key class name
+# (DSSKey is gone in paramiko 4, so classes are looked up by name)
+PEM_KEY_CLASSES = {
+    'RSA': 'RSAKey',
+    'EC': 'ECDSAKey',
+    'DSA': 'DSSKey',
+}
+OPENSSH_KEY_CLASSES = {
+    b'ssh-ed25519': 'Ed25519Key',
+    b'ssh-rsa': 'RSAKey',
+    b'ecdsa-sha2-': 'ECDSAKey',
+    b'ssh-dss': 'DSSKey',
+}
+KEY_CLASS_NAMES = ('RSAKey', 'Ed25519Key', 'ECDSAKey', 'DSSKey')
+
+
+def _sniff_key_class(key_data: str) -> Optional[str]:
+    """Guess the key class from the PEM header, without parsing the key"""
+    match = re.search(r'-----BEGIN ([A-Z]+) PRIVATE KEY-----', key_data)
+    if not match:
+        return None
+    
+    kind = match.group(1)
+    if kind != 'OPENSSH':
+        return PEM_KEY_CLASSES.get(kind)
+    
+    # OpenSSH format: the key type string sits near the start of the blob
+    body = ''.join(
+        line for line in key_data.splitlines() if line and not line.startswith('-----')
+    )
+    try:
+        blob = base64.b64decode(body)[:128]
+    except Exception:
+        return None
+    for marker, class_name in OPENSSH_KEY_CLASSES.items():
+        if marker in blob:
+            return class_name
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_private_key(key_data: str) -> paramiko.PKey:
+    """
+    Decode a private key once per process - key parsing is invariant across
+    reconnects and download workers. Keyed by the key material itself, so a
+    rotated key in the environment is parsed again.
+    """
+    # Try base64 decode first
+    if not key_data.startswith('-----BEGIN'):
+        try:
+            decoded = base64.b64decode(key_data)
+            key_data = decoded.decode('utf-8')
+        except Exception:
+            pass  # Not base64, use as-is
+    
+    # Load key from string
+    key_file = io.StringIO(key_data)
+    
+    # Sniffed key type first, then every other available type
+    sniffed = _sniff_key_class(key_data)
+    class_names = ([sniffed] if sniffed else []) + [
+        name for name in KEY_CLASS_NAMES if name != sniffed
+    ]
+    for class_name in class_names:
+        key_class = getattr(paramiko, class_name, None)
+        if key_class is None:
+            continue
+        try:
+            key_file.seek(0)
+            return key_class.from_private_key(key_file)
+        except Exception:
+            continue
+    
+    raise ValueError("Unsupported key format")
+
+
 class WRFDataFetcher:
     """
     Fetches WRF GRIB files via SSH with proxy jump server
@@ -52,7 +161,18 @@ class WRFDataFetcher:
         # ===== Paths & settings =====
         remote_archive_path: str = '/home/nwp/DA/SEVERE',
         local_data_path: str = 'data/raw',
-        timeout: int = 60
+        timeout: int = 60,
+        max_workers: int = 8,
+        request_size: int = 32768,
+        prefetch_depth: Optional[int] = 64,
+        listdir_ttl: int = 60,
+        use_tar_stream: bool = True,
+        chunk_size: int = 1 << 20,
+        window_size: int = 8 << 20,
+        max_packet_size: int = 1 << 18,
+        sftp_pool_size: Optional[int] = None,
+        compression: bool = False,
+        transfer_backend: str = 'paramiko'
     ):
     
         self.proxy_host = proxy_host
@@ -67,41 +187,64 @@ class WRFDataFetcher:
         self.target_password = target_password
         self.target_key_data = target_key_data
         
+        # zlib on already-compressed GRIB2 only burns CPU on the reader thread
+        self.compression = compression
+        
         self.remote_archive_path = remote_archive_path
         self.local_data_path = Path(local_data_path)
         self.timeout = timeout
+        self.max_workers = max_workers
+        # SFTP read size (lower to 4096 for servers returning short blocks)
+        # and max in-flight prefetch READs (bounded: unlimited prefetch can
+        # stall on high-latency links; None = paramiko's unbounded default)
+        self.request_size = request_size
+        self.prefetch_depth = prefetch_depth
+        # Local copy loop reads/writes this much at a time (SFTP throughput
+        # plateaus around 1 MiB buffers) and the SFTP channel flow-control
+        # window and max packet, large enough to keep the prefetch pipeline full
+        self.chunk_size = chunk_size
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        
+        # Remote directory listings: path -> (fetched_at, {name: SFTPAttributes})
+        self.listdir_ttl = listdir_ttl
+        self._listdir_cache: Dict[str, tuple] = {}
+        
+        # Bulk downloads as one remote `tar -c` stream instead of per-file SFTP
+        self.use_tar_stream = use_tar_stream
+        
+        # Bulk downloads through the native OpenSSH sftp client (C packet
+        # handling) instead of paramiko; listing and streaming stay on paramiko
+        if transfer_backend not in TRANSFER_BACKENDS:
+            raise ValueError(f"Unknown transfer backend: {transfer_backend}")
+        self.transfer_backend = transfer_backend
         
         self.proxy_client = None
         self.target_client = None
         self.sftp_client = None
         self.proxy_transport = None
+        # True when connect() opened the cached proxy rather than reusing it
+        self._owns_proxy = False
+        self._reconnect_lock = threading.Lock()
+        
+        # SFTP sessions multiplexed over the one authenticated target
+        # transport, checked out per operation (SFTPClient is not thread-safe).
+        # Keep the size under sshd MaxSessions (default 10).
+        self.sftp_pool_size = sftp_pool_size or max_workers
+        self._sftp_pool: queue.LifoQueue = queue.LifoQueue()
+        self._sftp_sessions: List[paramiko.SFTPClient] = []
+        self._sftp_lock = threading.Lock()
+        
+        # Local directories already created, so per-file downloads skip mkdir
+        self._local_dirs: Set[str] = set()
     
-    def _load_private_key(self, key_data: str) -> paramiko.RSAKey:
+    def _load_private_key(self, key_data: str) -> paramiko.PKey:
         """
         Load SSH private key from string (supports base64 or PEM format)
+        Parsed keys are memoized per process (see _parse_private_key)
         """
         try:
-            # Try base64 decode first
-            if not key_data.startswith('-----BEGIN'):
-                try:
-                    decoded = base64.b64decode(key_data)
-                    key_data = decoded.decode('utf-8')
-                except Exception:
-                    pass  # Not base64, use as-is
-            
-            # Load key from string
-            key_file = io.StringIO(key_data)
-            
-            # Try different key types
-            for key_class in [paramiko.RSAKey, paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.DSSKey]:
-                try:
-                    key_file.seek(0)
-                    return key_class.from_private_key(key_file)
-                except Exception:
-                    continue
-            
-            raise ValueError("Unsupported key format")
-            
+            return _parse_private_key(key_data)
         except Exception as e:
             logger.error(f"Failed to load SSH private key: {e}")
             raise ValueError(f"Invalid SSH private key: {e}")
@@ -112,33 +255,8 @@ class WRFDataFetcher:
         Uses SSH keys for authentication (secure, no passwords)
         """
         try:
-            # Step 1: Connect to proxy server
-            logger.info(f"🔗 Connecting to proxy server {self.proxy_username}@{self.proxy_host}:{self.proxy_port}...")
-            self.proxy_client = paramiko.SSHClient()
-            self.proxy_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Determine authentication method for proxy
-            proxy_auth_kwargs = {
-                'hostname': self.proxy_host,
-                'port': self.proxy_port,
-                'username': self.proxy_username,
-                'timeout': self.timeout,
-                'banner_timeout': self.timeout,
-                'look_for_keys': False,  # Don't search default locations
-            }
-            
-            if self.proxy_key_data:
-                logger.info("  Using SSH key for proxy authentication")
-                proxy_key = self._load_private_key(self.proxy_key_data)
-                proxy_auth_kwargs['pkey'] = proxy_key
-            elif self.proxy_password:
-                logger.info("  Using password for proxy authentication")
-                proxy_auth_kwargs['password'] = self.proxy_password
-            else:
-                raise ValueError("No authentication method provided for proxy server")
-            
-            self.proxy_client.connect(**proxy_auth_kwargs)
-            logger.info("✓ Proxy connection established")
+            # Step 1: Connect to proxy server (or reuse this process's open one)
+            self.proxy_client = self._get_or_open_proxy()
             
             # Step 2: Create transport channel through proxy
             self.proxy_transport = self.proxy_client.get_transport()
@@ -168,6 +286,7 @@ class WRFDataFetcher:
                 'timeout': self.timeout,
                 'banner_timeout': self.timeout,
                 'look_for_keys': False,
+                'compress': self.compression,
             }
             
             if self.target_key_data:
@@ -183,22 +302,84 @@ class WRFDataFetcher:
             self.target_client.connect(**target_auth_kwargs)
             logger.info("✓ Target server connection established")
             
-            # Step 4: Open SFTP session
-            self.sftp_client = self.target_client.open_sftp()
+            # Keepalives so a dead link errors out instead of stalling workers
+            target_transport = self.target_client.get_transport()
+            self.proxy_transport.set_keepalive(KEEPALIVE_INTERVAL)
+            target_transport.set_keepalive(KEEPALIVE_INTERVAL)
+            
+            # Fewer mid-download rekey stalls on multi-GB runs
+            target_transport.packetizer.REKEY_BYTES = REKEY_BYTES
+            
+            # Step 4: Open SFTP session (first member of the session pool)
+            self.sftp_client = self._open_sftp()
+            self._sftp_sessions.append(self.sftp_client)
+            self._sftp_pool.put(self.sftp_client)
             logger.info("✓ SFTP session opened")
             
             return True
             
         except Exception as e:
             logger.error(f"❌ Connection failed: {e}", exc_info=True)
+            # A proxy this connect opened may be the broken hop; open a fresh
+            # one next time. A reused one belongs to other fetchers too.
+            if self.proxy_client is not None and self._owns_proxy:
+                close_proxy_cache(self.proxy_client)
             self.disconnect()
             return False
     
+    def _get_or_open_proxy(self) -> paramiko.SSHClient:
+        """
+        Authenticated proxy connection, shared by every fetcher in the process
+        
+        Only the direct-tcpip channel and the target handshake are paid per
+        connect; the proxy handshake happens once while its transport stays up.
+        """
+        key = (self.proxy_host, self.proxy_port, self.proxy_username)
+        with _proxy_cache_lock:
+            proxy_client = _PROXY_CACHE.get(key)
+            transport = proxy_client.get_transport() if proxy_client else None
+            if transport is not None and transport.is_active():
+                logger.info(f"♻️  Reusing proxy connection {self.proxy_username}@{self.proxy_host}:{self.proxy_port}")
+                self._owns_proxy = False
+                return proxy_client
+            
+            logger.info(f"🔗 Connecting to proxy server {self.proxy_username}@{self.proxy_host}:{self.proxy_port}...")
+            proxy_client = paramiko.SSHClient()
+            proxy_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            
+            # Determine authentication method for proxy
+            proxy_auth_kwargs = {
+                'hostname': self.proxy_host,
+                'port': self.proxy_port,
+                'username': self.proxy_username,
+                'timeout': self.timeout,
+                'banner_timeout': self.timeout,
+                'look_for_keys': False,  # Don't search default locations
+                'compress': self.compression,
+            }
+            
+            if self.proxy_key_data:
+                logger.info("  Using SSH key for proxy authentication")
+                proxy_key = self._load_private_key(self.proxy_key_data)
+                proxy_auth_kwargs['pkey'] = proxy_key
+            elif self.proxy_password:
+                logger.info("  Using password for proxy authentication")
+                proxy_auth_kwargs['password'] = self.proxy_password
+            else:
+                raise ValueError("No authentication method provided for proxy server")
+            
+            proxy_client.connect(**proxy_auth_kwargs)
+            logger.info("✓ Proxy connection established")
+            
+            _PROXY_CACHE[key] = proxy_client
+            self._owns_proxy = True
+            return proxy_client
+    
     def disconnect(self):
-        """Close all connections"""
+        """Close the SFTP and target connections (the proxy stays cached)"""
         try:
             if self.sftp_client:
-                self.sftp_client.close()
+                self._close_sftp_pool()
                 self.sftp_client = None
                 logger.info("SFTP session closed")
             
@@ -207,14 +388,94 @@ class WRFDataFetcher:
                 self.target_client = None
                 logger.info("Target server connection closed")
             
-            if self.proxy_client:
-                self.proxy_client.close()
-                self.proxy_client = None
-                logger.info("Proxy connection closed")
+            # The proxy connection stays open in _PROXY_CACHE for the next
+            # connect (see close_proxy_cache)
+            self.proxy_client = None
                 
         except Exception as e:
             logger.warning(f"Error during disconnect: {e}")
     
+    def _open_sftp(self) -> paramiko.SFTPClient:
+        """
+        Open an SFTP session on the target transport with a widened window
+        Reads that stall longer than self.timeout raise instead of hanging.
+        """
+        sftp = paramiko.SFTPClient.from_transport(
+            self.target_client.get_transport(),
+            window_size=self.window_size,
+            max_packet_size=self.max_packet_size,
+        )
+        sftp.get_channel().settimeout(self.timeout)
+        return sftp
+    
+    @contextmanager
+    def acquire_sftp(self):
+        """
+        Check an SFTP session out of the pool for the duration of the block
+        
+        Sessions are opened lazily up to sftp_pool_size, then callers wait for
+        one to be returned. Sessions whose channel has closed are dropped.
+        """
+        if not self.sftp_client:
+            raise ConnectionError("Not connected")
+        
+        try:
+            sftp = self._sftp_pool.get_nowait()
+        except queue.Empty:
+            with self._sftp_lock:
+                sftp = None
+                if len(self._sftp_sessions) < self.sftp_pool_size:
+                    sftp = self._open_sftp()
+                    self._sftp_sessions.append(sftp)
+            if sftp is None:
+                sftp = self._sftp_pool.get(timeout=self.timeout * 10)
+        
+        try:
+            yield sftp
+        finally:
+            if sftp.get_channel().closed:
+                self._discard_sftp(sftp)
+            else:
+                self._sftp_pool.put(sftp)
+    
+    def _discard_sftp(self, sftp: paramiko.SFTPClient):
+        """Close a broken SFTP session and free its slot in the pool"""
+        try:
+            sftp.close()
+        except Exception:
+            pass
+        with self._sftp_lock:
+            if sftp in self._sftp_sessions:
+                self._sftp_sessions.remove(sftp)
+    
+    def _reconnect_if_dead(self):
+        """Re-establish the target connection if its transport has dropped"""
+        with self._reconnect_lock:
+            if self.is_connected():
+                return
+            logger.info("♻️  SSH transport dropped, reconnecting")
+            self.disconnect()
+            if not self.connect():
+                raise ConnectionError("Failed to reconnect to WRF server")
+    
+    def _close_sftp_pool(self):
+        """Close every pooled SFTP session"""
+        with self._sftp_lock:
+            sessions, self._sftp_sessions = self._sftp_sessions, []
+            self._sftp_pool = queue.LifoQueue()
+        for sftp in sessions:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+    
+    def is_connected(self) -> bool:
+        """True while the SFTP session's transport is still alive"""
+        if not self.sftp_client or not self.target_client:
+            return False
+        transport = self.target_client.get_transport()
+        return transport is not None and transport.is_active()
+    
     def __enter__(self):
         if not self.connect():
             raise ConnectionError("Failed to establish SSH connection")
@@ -232,20 +493,49 @@ class WRFDataFetcher:
         """
         return run_date.strftime('%Y%m%d%H')
     
-    def list_available_runs(self) -> List[str]:
+    def _cached_listdir_attr(self, remote_path: str) -> Dict[str, paramiko.SFTPAttributes]:
+        """
+        sftp.listdir_attr with a TTL cache - names plus size/mtime for a whole
+        directory in one round-trip per listdir_ttl seconds
+        """
+        cached = self._listdir_cache.get(remote_path)
+        if cached is not None and time.time() - cached[0] < self.listdir_ttl:
+            return cached[1]
+        
+        with self.acquire_sftp() as sftp:
+            attrs = {attr.filename: attr for attr in sftp.listdir_attr(remote_path)}
+        self._listdir_cache[remote_path] = (time.time(), attrs)
+        return attrs
+    
+    def _cached_listdir(self, remote_path: str) -> KeysView[str]:
+        """Names in a remote directory (cached, see _cached_listdir_attr)"""
+        return self._cached_listdir_attr(remote_path).keys()
+    
+    def _iter_run_folders(self):
+        """Valid run folder names (10 digits: YYYYMMDDHH) in listing order"""
+        for name in self._cached_listdir(self.remote_archive_path):
+            if len(name) == 10 and name.isdigit():
+                yield name
+    
+    def list_available_runs(self, limit: Optional[int] = None) -> List[str]:
         """
         List all available forecast runs in the archive
+        
+        Args:
+            limit: Return only the most recent N runs (partial selection
+                instead of sorting the whole archive)
         """
         if not self.sftp_client:
             raise ConnectionError("Not connected. Call connect() first.")
         
         try:
             logger.info(f"Listing folders in {self.remote_archive_path}")
-            folders = self.sftp_client.listdir(self.remote_archive_path)
             
-            # Filter for valid date folders (10 digits: YYYYMMDDHH)
-            valid_folders = [f for f in folders if len(f) == 10 and f.isdigit()]
-            valid_folders.sort(reverse=True)  # Most recent first
+            # Most recent first
+            if limit is not None:
+                valid_folders = heapq.nlargest(limit, self._iter_run_folders())
+            else:
+                valid_folders = sorted(self._iter_run_folders(), reverse=True)
             
             logger.info(f"Found {len(valid_folders)} forecast runs")
             return valid_folders
@@ -256,21 +546,23 @@ class WRFDataFetcher:
     
     def get_latest_run_folder(self) -> Optional[str]:
         """Get the most recent forecast run folder"""
-        runs = self.list_available_runs()
-        return runs[0] if runs else None
+        if not self.sftp_client:
+            raise ConnectionError("Not connected. Call connect() first.")
+        
+        try:
+            return max(self._iter_run_folders(), default=None)
+        except Exception as e:
+            logger.error(f"Error listing runs: {e}")
+            return None
     
     def check_run_exists(self, run_date: datetime) -> bool:
         """
         Check if a forecast run exists for the given date
         """
         folder_name = self.get_forecast_folder_name(run_date)
-        remote_path = f"{self.remote_archive_path}/{folder_name}"
         
         try:
-            self.sftp_client.stat(remote_path)
-            return True
-        except FileNotFoundError:
-            return False
+            return folder_name in self._cached_listdir(self.remote_archive_path)
         except Exception as e:
             logger.error(f"Error checking run existence: {e}")
             return False
@@ -284,7 +576,7 @@ class WRFDataFetcher:
             domain: 'kenya' (d01), 'east-africa' (d02), or 'both'
         
         Returns:
-            List of dicts with file info: {name, remote_path, hour, domain}
+            List of dicts with file info: {name, remote_path, hour, domain, attr}
         """
         if not self.sftp_client:
             raise ConnectionError("Not connected")
@@ -293,37 +585,33 @@ class WRFDataFetcher:
         remote_folder = f"{self.remote_archive_path}/{folder_name}"
         
         try:
-            files = self.sftp_client.listdir(remote_folder)
+            attrs = self._cached_listdir_attr(remote_folder)
             
             grib_files = []
+            wanted_suffix = DOMAIN_FILE_SUFFIXES.get(domain)  # None -> any domain
+            fullmatch = GRIB_FILENAME_RE.fullmatch
             
-            for filename in files:
+            for filename, attr in attrs.items():
                 # Parse WRFPRS_d01.XX or WRFPRS_d02.XX
-                if filename.startswith('WRFPRS_d'):
-                    parts = filename.split('.')
-                    if len(parts) == 2:
-                        domain_part = parts[0]  # WRFPRS_d01 or WRFPRS_d02
-                        hour_part = parts[1]    # 00, 01, 02, ..., 72
-                        
-                        domain_suffix = domain_part[-2:]  # '01' or '02'
-                        domain_name = 'kenya' if domain_suffix == '01' else 'east-africa'
-                        
-                        # Filter by domain if specified
-                        if domain == 'both' or \
-                           (domain == 'kenya' and domain_suffix == '01') or \
-                           (domain == 'east-africa' and domain_suffix == '02'):
-                            
-                            try:
-                                hour = int(hour_part)
-                                grib_files.append({
-                                    'name': filename,
-                                    'remote_path': f"{remote_folder}/{filename}",
-                                    'hour': hour,
-                                    'domain': domain_name,
-                                    'domain_suffix': domain_suffix
-                                })
-                            except ValueError:
-                                continue
+                match = fullmatch(filename)
+                if not match:
+                    continue
+                
+                domain_suffix, hour = match.groups()
+                domain_code = SUFFIX_DOMAINS.get(domain_suffix)
+                
+                # Skip unknown domains and filter by domain if specified
+                if domain_code is None or (wanted_suffix is not None and domain_suffix != wanted_suffix):
+                    continue
+                
+                grib_files.append({
+                    'name': filename,
+                    'remote_path': f"{remote_folder}/{filename}",
+                    'hour': int(hour),  # 00, 01, 02, ..., 72
+                    'domain': domain_code,
+                    'domain_suffix': domain_suffix,
+                    'attr': attr,  # size/mtime from the listing
+                })
             
             grib_files.sort(key=lambda x: (x['domain_suffix'], x['hour']))
             logger.info(f"Found {len(grib_files)} GRIB files for {folder_name}")
@@ -333,46 +621,237 @@ class WRFDataFetcher:
             logger.error(f"Error listing GRIB files: {e}")
             return []
     
-    def download_file(self, remote_path: str, local_path: str, max_retries: int = 3) -> bool:
+    def download_file(
+        self,
+        remote_path: str,
+        local_path: str,
+        max_retries: int = 3,
+        sftp: Optional[paramiko.SFTPClient] = None,
+        remote_attr: Optional[paramiko.SFTPAttributes] = None
+    ) -> bool:
         """
         Download a single file with retry logic
+        
+        Data goes to `<local_path>.part` and is renamed into place only once
+        the size is verified, so a partial file never passes for a complete one.
+        Transient failures are retried with jittered exponential backoff, within
+        RETRY_BUDGET seconds, on a fresh SFTP session (reconnecting first if
+        the transport dropped); permanent errors fail immediately.
+        
+        Args:
+            sftp: SFTP session to use (defaults to one checked out of the pool)
+            remote_attr: Known size/mtime (e.g. from listdir_attr) - saves the
+                stat round-trip on the first attempt
         """
-        if not self.sftp_client:
-            raise ConnectionError("Not connected")
+        if sftp is None:
+            with self.acquire_sftp() as pooled:
+                return self.download_file(
+                    remote_path, local_path, max_retries, pooled, remote_attr
+                )
         
         # Ensure local directory exists
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        self._ensure_local_dir(os.path.dirname(local_path))
+        part_path = local_path + '.part'
         
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"📥 Downloading: {os.path.basename(remote_path)} (attempt {attempt + 1}/{max_retries})")
+        deadline = time.monotonic() + RETRY_BUDGET
+        
+        # Sessions opened to replace a broken one are returned to the pool on exit
+        with ExitStack() as retry_sessions:
+            for attempt in range(max_retries):
+                broken = False
+                try:
+                    logger.info(f"📥 Downloading: {os.path.basename(remote_path)} (attempt {attempt + 1}/{max_retries})")
+                    
+                    # Get file size
+                    if remote_attr is None or attempt > 0:
+                        remote_attr = sftp.stat(remote_path)
+                    file_size = remote_attr.st_size
+                    file_size_mb = file_size / (1024 * 1024)
+                    
+                    # Skip if already downloaded
+                    if self._is_current(local_path, remote_attr):
+                        logger.info(f"   ↪ Already exists, skipping {os.path.basename(local_path)}")
+                        return True
+                    
+                    start_time = time.time()
+                    with self._open_local(part_path, file_size) as local_file:
+                        self._pipelined_read(sftp, remote_path, local_file, file_size)
+                    elapsed = time.time() - start_time
+                    
+                    # Verify download
+                    if os.path.getsize(part_path) == file_size:
+                        os.replace(part_path, local_path)
+                        speed_mbps = file_size_mb / elapsed if elapsed > 0 else 0
+                        logger.info(f"✓ Downloaded {file_size_mb:.2f}MB in {elapsed:.1f}s ({speed_mbps:.2f}MB/s)")
+                        return True
+                    else:
+                        logger.warning(f"⚠️ File size mismatch for {local_path}")
                 
-                # Get file size
-                file_size = self.sftp_client.stat(remote_path).st_size
-                file_size_mb = file_size / (1024 * 1024)
+                except Exception as e:
+                    logger.error(f"❌ Download attempt {attempt + 1} failed: {e}")
+                    if not isinstance(e, RETRYABLE_ERRORS) or isinstance(e, paramiko.AuthenticationException):
+                        self._remove_part(part_path)
+                        return False
+                    broken = True
                 
-                start_time = time.time()
-                self.sftp_client.get(remote_path, local_path)
-                elapsed = time.time() - start_time
+                self._remove_part(part_path)
                 
-                # Verify download
-                if os.path.exists(local_path) and os.path.getsize(local_path) == file_size:
-                    speed_mbps = file_size_mb / elapsed if elapsed > 0 else 0
-                    logger.info(f"✓ Downloaded {file_size_mb:.2f}MB in {elapsed:.1f}s ({speed_mbps:.2f}MB/s)")
-                    return True
-                else:
-                    logger.warning(f"⚠️ File size mismatch for {local_path}")
-                    if os.path.exists(local_path):
-                        os.remove(local_path)
-                    
-            except Exception as e:
-                logger.error(f"❌ Download attempt {attempt + 1} failed: {e}")
                 if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2
-                    logger.info(f"Retrying in {wait_time}s...")
+                    # Full jitter keeps parallel workers from retrying in lockstep
+                    wait_time = random.uniform(0, min(2 ** attempt, MAX_RETRY_WAIT))
+                    if time.monotonic() + wait_time > deadline:
+                        logger.error(f"❌ Retry budget exhausted for {os.path.basename(remote_path)}")
+                        break
+                    logger.info(f"Retrying in {wait_time:.1f}s...")
                     time.sleep(wait_time)
+                    
+                    if broken:
+                        # The failed session may be mid-request or on a dead
+                        # channel - retrying on it would just fail again
+                        self._discard_sftp(sftp)
+                        try:
+                            self._reconnect_if_dead()
+                            sftp = retry_sessions.enter_context(self.acquire_sftp())
+                        except Exception as e:
+                            logger.error(f"❌ Could not reopen SFTP session: {e}")
+                            return False
+
+            return False
+    
+    @staticmethod
+    def _remove_part(part_path: str):
+        """Delete a partial download, if any"""
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+    
+    def _ensure_local_dir(self, path) -> None:
+        """Create a local directory once per fetcher"""
+        path = str(path)
+        if path not in self._local_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._local_dirs.add(path)
+    
+    @staticmethod
+    @contextmanager
+    def _open_local(path, size: Optional[int] = None):
+        """
+        Open a local destination for chunked writes
+        
+        Unbuffered: reads arrive in chunk_size pieces already, so each chunk
+        goes straight to os.write without a copy through a Python buffer. The
+        full size is preallocated where supported, avoiding block allocation
+        stalls mid-download; the file is cut back to what was actually written
+        so a short transfer still fails the size check.
+        """
+        with open(path, 'wb', buffering=0) as local_file:
+            if size and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(local_file.fileno(), 0, size)
+                except OSError:
+                    pass  # Filesystem without fallocate support
+            try:
+                yield local_file
+            finally:
+                local_file.truncate(local_file.tell())
+    
+    @staticmethod
+    def _scan_local(folder) -> Dict[str, os.stat_result]:
+        """Stat every regular file in a local folder with one scandir pass"""
+        try:
+            with os.scandir(folder) as entries:
+                return {
+                    entry.name: entry.stat()
+                    for entry in entries if entry.is_file(follow_symlinks=False)
+                }
+        except OSError:
+            return {}
+    
+    @staticmethod
+    def _is_current(local_path, remote_attr, local_stat: Optional[os.stat_result] = None) -> bool:
+        """
+        True if the local copy matches the remote size and is not older
+        than the remote file (i.e. it does not need downloading again)
+        
+        Args:
+            local_stat: Already-known stat of local_path (e.g. from _scan_local);
+                stats the file when omitted
+        """
+        if local_stat is None:
+            try:
+                local_stat = os.stat(local_path)
+            except OSError:
+                return False
         
-        return False
+        if remote_attr is None or local_stat.st_size != remote_attr.st_size:
+            return False
+        return remote_attr.st_mtime is None or local_stat.st_mtime >= remote_attr.st_mtime
+    
+    def _pipelined_read(
+        self,
+        sftp: paramiko.SFTPClient,
+        remote_path: str,
+        dest,
+        file_size: Optional[int] = None
+    ):
+        """
+        Copy a remote file into a writable file object with many READ
+        requests in flight (prefetch) instead of one round-trip per chunk
+        """
+        with sftp.open(remote_path, 'rb') as remote_file:
+            remote_file.MAX_REQUEST_SIZE = self.request_size
+            remote_file.set_pipelined(True)
+            remote_file.prefetch(file_size, max_concurrent_requests=self.prefetch_depth)
+            
+            while True:
+                chunk = remote_file.read(self.chunk_size)
+                if not chunk:
+                    break
+                dest.write(chunk)
+    
+    def _download_with_own_channel(
+        self,
+        remote_path: str,
+        local_path: str,
+        remote_attr: Optional[paramiko.SFTPAttributes] = None
+    ) -> bool:
+        """
+        Download on an SFTP channel checked out of the pool
+        """
+        with self.acquire_sftp() as sftp:
+            return self.download_file(remote_path, local_path, sftp=sftp, remote_attr=remote_attr)
+    
+    def download_to_memory(self, remote_path: str) -> io.BytesIO:
+        """
+        Read a remote file straight into memory (no local disk staging)
+        
+        Returns:
+            BytesIO positioned at the start of the file contents
+        """
+        if not self.sftp_client:
+            raise ConnectionError("Not connected")
+        
+        logger.info(f"📥 Streaming: {os.path.basename(remote_path)}")
+        
+        start_time = time.time()
+        buffer = io.BytesIO()
+        with self.acquire_sftp() as sftp:
+            self._pipelined_read(sftp, remote_path, buffer)
+        elapsed = time.time() - start_time
+        
+        size_mb = buffer.tell() / (1024 * 1024)
+        speed_mbps = size_mb / elapsed if elapsed > 0 else 0
+        logger.info(f"✓ Streamed {size_mb:.2f}MB in {elapsed:.1f}s ({speed_mbps:.2f}MB/s)")
+        
+        buffer.seek(0)
+        return buffer
+    
+    def fetch_bytes(self, remote_path: str) -> bytes:
+        """
+        Read a remote file straight into memory and return its contents
+        """
+        return self.download_to_memory(remote_path).getvalue()
     
     def download_forecast_run(
         self,
@@ -397,7 +876,7 @@ class WRFDataFetcher:
         
         folder_name = self.get_forecast_folder_name(run_date)
         local_folder = self.local_data_path / folder_name
-        local_folder.mkdir(parents=True, exist_ok=True)
+        self._ensure_local_dir(local_folder)
         
         logger.info(f"📦 Starting download for run: {folder_name}")
         logger.info(f"   Domain: {domain}, Max hours: {max_hours}")
@@ -417,34 +896,279 @@ class WRFDataFetcher:
         
         logger.info(f"   Total files to download: {len(grib_files)}")
         
-        for i, file_info in enumerate(grib_files, 1):
-            remote_path = file_info['remote_path']
-            local_path = str(local_folder / file_info['name'])
+        # Skip files already downloaded: one directory scan instead of a stat per file
+        local_stats = self._scan_local(local_folder)
+        current = [
+            f for f in grib_files
+            if f['name'] in local_stats
+            and self._is_current(local_folder / f['name'], f['attr'], local_stats[f['name']])
+        ]
+        if current:
+            logger.info(f"   ↪ {len(current)} files already exist, skipping")
+            results['success'].extend(str(local_folder / f['name']) for f in current)
+            grib_files = [f for f in grib_files if f not in current]
+        
+        # One bulk transfer first (OpenSSH batch or streamed tar); anything it
+        # misses goes per-file over paramiko
+        remote_folder = f"{self.remote_archive_path}/{folder_name}"
+        extracted = None
+        if grib_files and self.transfer_backend == 'openssh':
+            extracted = self.download_files_via_openssh(grib_files, local_folder)
+        elif grib_files and self.use_tar_stream:
+            extracted = self.download_files_via_tar(
+                remote_folder, [f['name'] for f in grib_files], local_folder
+            )
+        if extracted is not None:
+            results['success'].extend(
+                str(local_folder / f['name']) for f in grib_files if f['name'] in extracted
+            )
+            grib_files = [f for f in grib_files if f['name'] not in extracted]
+        
+        if grib_files:
+            logger.info(f"   Per-file SFTP for {len(grib_files)} files ({self.max_workers} workers)")
             
-            logger.info(f"   [{i}/{len(grib_files)}] {file_info['name']}")
+            # Workers check SFTP channels out of the session pool
+            self._download_all(grib_files, local_folder, results)
+        
+        logger.info(f"✓ Download complete: {len(results['success'])}/{results['total']} successful")
+        
+        return results
+    
+    def download_files_via_tar(
+        self,
+        remote_folder: str,
+        names: List[str],
+        local_folder: Path
+    ) -> Optional[Set[str]]:
+        """
+        Download many files as one `tar -c` stream over an exec channel
+        
+        Callers pass only files that need downloading (download_forecast_run
+        skips current ones). Sizes are verified against the tar headers, so no
+        per-file stat is needed.
+        
+        Returns:
+            Set of file names now present locally, or None if the remote tar
+            stream is unavailable (caller falls back to per-file SFTP)
+        """
+        done = set()
+        pending = list(names)
+        if not pending:
+            return done
+        
+        command = f"cd {shlex.quote(remote_folder)} && tar -cf - " + \
+                  " ".join(shlex.quote(name) for name in pending)
+        wanted = set(pending)
+        
+        logger.info(f"📦 Streaming {len(pending)} files via remote tar")
+        start_time = time.time()
+        total_bytes = 0
+        
+        try:
+            _, stdout, stderr = self.target_client.exec_command(command, get_pty=False)
+            stdout.channel.settimeout(self.timeout)
             
-            # Skip if already downloaded
-            if os.path.exists(local_path):
-                try:
-                    remote_size = self.sftp_client.stat(remote_path).st_size
-                    local_size = os.path.getsize(local_path)
-                    
-                    if local_size == remote_size:
-                        logger.info(f"   ↪ Already exists, skipping")
-                        results['success'].append(local_path)
+            with tarfile.open(fileobj=stdout, mode='r|') as archive:
+                for member in archive:
+                    # Only plain files we asked for; never trust member paths
+                    if not member.isfile() or member.name not in wanted:
                         continue
-                except Exception:
-                    pass
+                    
+                    # Same .part + rename scheme as download_file: an
+                    # interrupted stream never leaves a truncated final file
+                    local_path = local_folder / member.name
+                    part_path = f"{local_path}.part"
+                    source = archive.extractfile(member)
+                    try:
+                        with self._open_local(part_path, member.size) as local_file:
+                            while True:
+                                chunk = source.read(self.chunk_size)
+                                if not chunk:
+                                    break
+                                local_file.write(chunk)
+                        
+                        if os.path.getsize(part_path) == member.size:
+                            os.replace(part_path, local_path)
+                            done.add(member.name)
+                            total_bytes += member.size
+                        else:
+                            logger.warning(f"⚠️ Size mismatch for {member.name}")
+                    finally:
+                        self._remove_part(part_path)
             
-            # Download
-            if self.download_file(remote_path, local_path):
-                results['success'].append(local_path)
-            else:
-                results['failed'].append(remote_path)
+            exit_status = stdout.channel.recv_exit_status()
+            if exit_status != 0:
+                logger.warning(
+                    f"⚠️ Remote tar exited {exit_status}: "
+                    f"{stderr.read().decode(errors='replace').strip()}"
+                )
+                if not wanted & done:
+                    return None
         
-        logger.info(f"✓ Download complete: {len(results['success'])}/{results['total']} successful")
+        except Exception as e:
+            logger.warning(f"⚠️ Tar stream failed, falling back to SFTP: {e}")
+            if not wanted & done:
+                return None
         
-        return results
+        elapsed = time.time() - start_time
+        size_mb = total_bytes / (1024 * 1024)
+        speed_mbps = size_mb / elapsed if elapsed > 0 else 0
+        logger.info(f"✓ Tar stream: {len(wanted & done)}/{len(pending)} files, "
+                    f"{size_mb:.2f}MB in {elapsed:.1f}s ({speed_mbps:.2f}MB/s)")
+        return done
+    
+    def download_files_via_openssh(
+        self,
+        grib_files: List[Dict],
+        local_folder: Path
+    ) -> Optional[Set[str]]:
+        """
+        Download files with the native OpenSSH sftp client in one batch session
+        
+        paramiko parses every SFTP packet in Python; the sftp binary does it in
+        C over a single connection (jump host via ProxyCommand).
+        
+        Args:
+            grib_files: File info dicts from list_grib_files() that need
+                downloading (current files are skipped by the caller)
+            local_folder: Destination folder
+        
+        Files land as `<name>.part` and are renamed once their size matches.
+        
+        Returns:
+            Set of file names present locally with the expected size, or None
+            when the sftp binary or key authentication is unavailable or the
+            batch times out
+        """
+        sftp_bin = shutil.which('sftp')
+        if not sftp_bin or not (self.proxy_key_data and self.target_key_data):
+            logger.warning("⚠️  OpenSSH backend needs the sftp binary and SSH keys, using paramiko")
+            return None
+        
+        done: Set[str] = set()
+        pending = list(grib_files)
+        if not pending:
+            return done
+        
+        ssh_opts = [
+            '-o', 'BatchMode=yes',
+            '-o', 'StrictHostKeyChecking=no',
+            '-o', 'UserKnownHostsFile=/dev/null',
+            '-o', f'ConnectTimeout={self.timeout}',
+        ]
+        
+        with tempfile.TemporaryDirectory(prefix='wrf-ssh-') as tmp:
+            proxy_key = self._write_key_file(tmp, 'proxy_key', self.proxy_key_data)
+            target_key = self._write_key_file(tmp, 'target_key', self.target_key_data)
+            
+            # '-get' keeps the batch going past a failed transfer
+            batch_path = os.path.join(tmp, 'batch')
+            with open(batch_path, 'w') as batch:
+                for file_info in pending:
+                    batch.write(f'-get "{file_info["remote_path"]}" "{local_folder / file_info["name"]}.part"\n')
+            
+            proxy_command = shlex.join([
+                'ssh', *ssh_opts, '-i', proxy_key, '-p', str(self.proxy_port),
+                '-W', '%h:%p', f'{self.proxy_username}@{self.proxy_host}'
+            ])
+            cmd = [
+                sftp_bin, '-b', batch_path, '-B', str(self.request_size),
+                *ssh_opts, '-o', f'ProxyCommand={proxy_command}',
+                '-i', target_key, '-P', str(self.target_port),
+            ]
+            if self.prefetch_depth:
+                cmd += ['-R', str(self.prefetch_depth)]
+            cmd.append(f'{self.target_username}@{self.target_host}')
+            
+            # A stalled link must not hang the fetch: allow self.timeout per
+            # file (plus one for the connection) before giving up on the batch
+            batch_timeout = self.timeout * (len(pending) + 1)
+            
+            logger.info(f"   OpenSSH sftp batch for {len(pending)} files")
+            start_time = time.time()
+            try:
+                proc = subprocess.run(
+                    cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                    timeout=batch_timeout
+                )
+            except subprocess.TimeoutExpired:
+                logger.warning(f"⚠️  sftp batch timed out after {batch_timeout}s, using paramiko")
+                for file_info in pending:
+                    self._remove_part(f"{local_folder / file_info['name']}.part")
+                return None
+            elapsed = time.time() - start_time
+            
+            if proc.returncode != 0:
+                logger.warning(f"⚠️  sftp exited with {proc.returncode}: {proc.stderr.strip()[-500:]}")
+        
+        # Trust only files whose size matches the remote listing
+        total_bytes = 0
+        for file_info in pending:
+            local_path = local_folder / file_info['name']
+            part_path = f"{local_path}.part"
+            attr = file_info.get('attr')
+            try:
+                if not os.path.exists(part_path):
+                    continue
+                size = os.path.getsize(part_path)
+                if attr is None or attr.st_size is None or size == attr.st_size:
+                    os.replace(part_path, local_path)
+                    done.add(file_info['name'])
+                    total_bytes += size
+                else:
+                    logger.warning(f"⚠️ Size mismatch for {file_info['name']}")
+            finally:
+                self._remove_part(part_path)
+        
+        size_mb = total_bytes / (1024 * 1024)
+        speed_mbps = size_mb / elapsed if elapsed > 0 else 0
+        logger.info(f"✓ OpenSSH fetched {size_mb:.2f}MB in {elapsed:.1f}s ({speed_mbps:.2f}MB/s)")
+        return done
+    
+    @staticmethod
+    def _write_key_file(folder: str, name: str, key_data: str) -> str:
+        """Write key material (base64 or PEM) to an owner-only file for ssh -i"""
+        if not key_data.startswith('-----BEGIN'):
+            try:
+                key_data = base64.b64decode(key_data).decode('utf-8')
+            except Exception:
+                pass  # Not base64, use as-is
+        
+        path = os.path.join(folder, name)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as key_file:
+            key_file.write(key_data.rstrip('\n') + '\n')
+        return path
+    
+    def _download_all(self, grib_files: List[Dict], local_folder: Path, results: Dict):
+        """Download grib_files concurrently, filling results['success'/'failed']"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._download_with_own_channel,
+                    file_info['remote_path'],
+                    str(local_folder / file_info['name']),
+                    file_info.get('attr')
+                ): file_info
+                for file_info in grib_files
+            }
+            
+            for i, future in enumerate(as_completed(futures), 1):
+                file_info = futures[future]
+                local_path = str(local_folder / file_info['name'])
+                
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logger.error(f"❌ {file_info['name']} failed: {e}")
+                    success = False
+                
+                logger.info(f"   [{i}/{len(grib_files)}] {file_info['name']} {'✓' if success else '✗'}")
+                
+                if success:
+                    results['success'].append(local_path)
+                else:
+                    results['failed'].append(file_info['remote_path'])
 
 
 def create_fetcher_from_config(config: Dict) -> WRFDataFetcher:
@@ -465,5 +1189,115 @@ def create_fetcher_from_config(config: Dict) -> WRFDataFetcher:
         target_key_data=config.get('SSH_PRIVATE_KEY'),
         remote_archive_path=config.get('REMOTE_BASE_PATH', '/home/nwp/DA/SEVERE'),
         local_data_path=config.get('LOCAL_DATA_PATH', 'data/raw'),
-        timeout=60
-    )
\ No newline at end of file
+        timeout=60,
+        max_workers=config.get('DOWNLOAD_WORKERS', 8),
+        request_size=config.get('SFTP_REQUEST_SIZE', 32768),
+        prefetch_depth=config.get('SFTP_PREFETCH_DEPTH', 64),
+        listdir_ttl=config.get('LISTDIR_TTL', 60),
+        use_tar_stream=config.get('USE_TAR_STREAM', True),
+        chunk_size=config.get('SFTP_CHUNK_SIZE', 1 << 20),
+        window_size=config.get('SFTP_WINDOW_SIZE', 8 << 20),
+        max_packet_size=config.get('SFTP_MAX_PACKET_SIZE', 1 << 18),
+        transfer_backend=config.get('TRANSFER_BACKEND', 'paramiko'),
+        sftp_pool_size=config.get('SFTP_POOL_SIZE'),
+        compression=config.get('SSH_COMPRESSION', False)
+    )
+
+# ============================================================
+# PERSISTENT CONNECTION (in-process ControlMaster/ControlPersist)
+# ============================================================
+
+# Open proxy (jump host) connections by (host, port, username)
+_PROXY_CACHE: Dict[tuple, paramiko.SSHClient] = {}
+_proxy_cache_lock = threading.Lock()
+
+
+def close_proxy_cache(proxy_client: Optional[paramiko.SSHClient] = None):
+    """
+    Close cached proxy connections - all of them, or just proxy_client
+    """
+    with _proxy_cache_lock:
+        for key, cached in list(_PROXY_CACHE.items()):
+            if proxy_client is None or cached is proxy_client:
+                del _PROXY_CACHE[key]
+                try:
+                    cached.close()
+                except Exception:
+                    pass
+                logger.info(f"Proxy connection closed ({key[2]}@{key[0]}:{key[1]})")
+
+
+_shared_fetcher: Optional[WRFDataFetcher] = None
+_shared_last_used = 0.0
+_shared_users: Dict[WRFDataFetcher, int] = {}  # fetcher -> callers holding it
+_shared_lock = threading.Lock()
+
+
+def _release_shared(fetcher: WRFDataFetcher) -> bool:
+    """Drop one user; True when a retired fetcher has no users left (lock held)"""
+    _shared_users[fetcher] -= 1
+    if _shared_users[fetcher] == 0 and fetcher is not _shared_fetcher:
+        del _shared_users[fetcher]
+        return True
+    return False
+
+
+@contextmanager
+def shared_fetcher(config: Dict):
+    """
+    Connected fetcher reused across calls in this process
+    
+    Skips the proxy + target handshakes on every request. The connection is
+    re-established when it has dropped or sat idle longer than
+    config['CONNECTION_PERSIST'] seconds. The lock only covers checking the
+    connection out; concurrent callers share it, each on its own SFTP
+    session from the fetcher's pool (see WRFDataFetcher.acquire_sftp).
+    A replaced connection is closed by its last user, never under another
+    caller's transfer.
+    """
+    global _shared_fetcher, _shared_last_used
+    
+    persist = config.get('CONNECTION_PERSIST', 7200)
+    retired = None
+    
+    with _shared_lock:
+        fetcher = _shared_fetcher
+        idle = time.time() - _shared_last_used
+        
+        if fetcher is not None and (idle > persist or not fetcher.is_connected()):
+            logger.info("♻️  Dropping stale SSH connection")
+            _shared_fetcher = None
+            if _shared_users.get(fetcher, 0) == 0:
+                _shared_users.pop(fetcher, None)
+                retired = fetcher
+            fetcher = None
+        
+        if fetcher is None:
+            fetcher = create_fetcher_from_config(config)
+            if not fetcher.connect():
+                raise ConnectionError("Failed to connect to WRF server")
+            _shared_fetcher = fetcher
+        else:
+            logger.info("🔁 Reusing persistent SSH connection")
+        _shared_users[fetcher] = _shared_users.get(fetcher, 0) + 1
+        _shared_last_used = time.time()
+    
+    if retired is not None:
+        retired.disconnect()
+    
+    try:
+        yield fetcher
+    except Exception as e:
+        # Only a broken link is retired; ordinary errors (missing remote
+        # file, bad GRIB) keep the connection for the next call
+        if isinstance(e, RETRYABLE_ERRORS) or not fetcher.is_connected():
+            with _shared_lock:
+                if _shared_fetcher is fetcher:
+                    _shared_fetcher = None
+        raise
+    finally:
+        with _shared_lock:
+            last_user = _release_shared(fetcher)
+            _shared_last_used = time.time()
+        if last_user:
+            fetcher.disconnect()
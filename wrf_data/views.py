@@ -5,35 +5,333 @@ File: wrf_data/views.py
 """
 
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from django.utils import timezone
 from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
 from django.conf import settings
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+import base64
+import hashlib
+import json
 import logging
-import os
-import tempfile
-import shutil
+import threading
+import time
+import uuid
+import zlib
 import numpy as np
 
-from .models import Domain, Parameter, ForecastRun, ForecastData, DataFetchLog
+from .models import (
+    Domain, Parameter, ForecastRun, CATALOG_CACHE_KEY, PACKED_NAN
+)
 from .serializers import (
     DomainSerializer,
     ParameterSerializer,
     ForecastRunListSerializer,
-    ForecastDataGridSerializer,
+    FetchTriggerSerializer,
 )
 
 logger = logging.getLogger(__name__)
 
+# Active domains/parameters change only through the admin; serve the
+# serialized lists from the cache (invalidated on save/delete in models.py).
+# The TTL still bounds staleness: LocMem is per-process (only the worker that
+# saved sees the delete), and QuerySet.update(), bulk_create and data
+# migrations send no signals on any backend.
+CATALOG_CACHE_TIMEOUT = 300
+
+# Domain bbox window + encoded grid coordinates, by (domain code, grid shape,
+# bbox, encoding). A domain's grid is identical for every run, timestep and parameter.
+_COORDS_CACHE = OrderedDict()  # LRU, guarded by _coords_cache_lock
+_COORDS_CACHE_SIZE = 8
+_coords_cache_lock = threading.Lock()
+
+# Repeat fetch triggers for the same run within this window reuse one task
+FETCH_DEDUPE_KEY = 'wrf:fetch:{}:{}'
+FETCH_DEDUPE_TIMEOUT = 60
+
+# Open GRIBProcessors by remote path: the other parameters of a timestep reuse
+# the downloaded file and its pygrib index. Each entry has its own lock since
+# pygrib handles are not safe to read from several threads, and is closed only
+# once it is both evicted and released by its last user.
+_PROCESSOR_CACHE = OrderedDict()  # remote_path -> _ProcessorEntry
+_PROCESSOR_CACHE_SIZE = 4
+_PROCESSOR_CACHE_TTL = 900
+_processor_cache_lock = threading.Lock()
+
+# get_data responses are cached as zlib-compressed JSON (nested grid lists
+# compress ~5x); a hit is served as-is without re-rendering
+GET_DATA_CACHE_TIMEOUT = 900
+
+
+# Browsers/proxies may reuse catalog responses for this long
+CATALOG_MAX_AGE = 60
+
+
+def _active_catalog():
+    """Serialized active domains and parameters (cached, see CATALOG_CACHE_KEY)"""
+    catalog = cache.get(CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = {
+            'domains': DomainSerializer(Domain.objects.filter(is_active=True), many=True).data,
+            'parameters': ParameterSerializer(Parameter.objects.filter(is_active=True), many=True).data,
+        }
+        # Content hash - changes exactly when a catalog response would
+        catalog['version'] = hashlib.sha1(
+            json.dumps(catalog, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:16]
+        cache.set(CATALOG_CACHE_KEY, catalog, CATALOG_CACHE_TIMEOUT)
+    return catalog
+
+
+def _catalog_response(request, catalog, build, *extra):
+    """
+    Catalog-backed response with an ETag, or 304 when the client's copy matches
+    
+    Args:
+        request: Incoming request (If-None-Match is checked)
+        catalog: Result of _active_catalog()
+        build: Callable returning the full response on a miss
+        *extra: Other inputs the response depends on (e.g. today's date)
+    """
+    key = ':'.join([catalog['version'], request.get_full_path(), *map(str, extra)])
+    etag = quote_etag(hashlib.sha1(key.encode('utf-8')).hexdigest()[:16])
+    
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build()
+        response['ETag'] = etag
+    return _client_cacheable(response)
+
+
+def _bbox_window(lats, lons, bbox):
+    """
+    Row/column slices of the smallest grid window covering a lat/lon box
+    
+    Slicing (not masking) keeps the cropped grids as views. The whole grid is
+    returned when no cell falls inside the box.
+    """
+    min_lat, max_lat, min_lon, max_lon = bbox
+    inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+    rows = np.flatnonzero(inside.any(axis=1))
+    cols = np.flatnonzero(inside.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return slice(None), slice(None)
+    return slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+
 
-@api_view(["GET"])
+def _cached_coords(coords_key, read):
+    """
+    (bbox window, coords payload) for a grid from the LRU _COORDS_CACHE
+    
+    read() returns read_arrays output with coordinates; it is only called on
+    a miss, outside the lock (concurrent misses just compute it twice).
+    """
+    from .utils.grib_processor import _coords_payload
+    
+    with _coords_cache_lock:
+        cached = _COORDS_CACHE.get(coords_key)
+        if cached is not None:
+            _COORDS_CACHE.move_to_end(coords_key)
+            return cached
+    
+    binary, bbox = coords_key[3], coords_key[2]
+    _, lats, lons, _ = read()
+    window = _bbox_window(lats, lons, bbox)
+    cached = (window, _coords_payload(lats[window], lons[window], binary))
+    
+    with _coords_cache_lock:
+        _COORDS_CACHE[coords_key] = cached
+        _COORDS_CACHE.move_to_end(coords_key)
+        while len(_COORDS_CACHE) > _COORDS_CACHE_SIZE:
+            _COORDS_CACHE.popitem(last=False)
+    return cached
+
+
+class _ProcessorEntry:
+    """Cached GRIBProcessor with its read lock and user count"""
+    
+    def __init__(self, processor):
+        self.processor = processor
+        self.lock = threading.Lock()
+        self.opened_at = time.monotonic()
+        self.users = 0
+        self.evicted = False
+
+
+def _evict_processor(entry, closing):
+    """Mark an entry evicted; queue it for closing if nobody holds it (cache lock held)"""
+    entry.evicted = True
+    if entry.users == 0:
+        closing.append(entry)
+
+
+def _close_processors(entries):
+    """Close processors that are evicted and no longer in use"""
+    for entry in entries:
+        entry.processor.close()
+
+
+@contextmanager
+def _cached_processor(remote_path, load):
+    """
+    Open GRIBProcessor for a remote file, locked for the caller
+    
+    Args:
+        remote_path: Remote GRIB path (cache key)
+        load: Callable returning the GRIB bytes on a cache miss
+    """
+    from .utils.grib_processor import GRIBProcessor
+    
+    closing = []
+    with _processor_cache_lock:
+        entry = _PROCESSOR_CACHE.get(remote_path)
+        if entry and time.monotonic() - entry.opened_at > _PROCESSOR_CACHE_TTL:
+            _evict_processor(_PROCESSOR_CACHE.pop(remote_path), closing)
+            entry = None
+        elif entry:
+            _PROCESSOR_CACHE.move_to_end(remote_path)
+            entry.users += 1
+    
+    if entry is None:
+        processor = GRIBProcessor(load(remote_path))
+        processor.open()
+        entry = _ProcessorEntry(processor)
+        with _processor_cache_lock:
+            entry.users += 1
+            if remote_path in _PROCESSOR_CACHE:
+                _evict_processor(_PROCESSOR_CACHE.pop(remote_path), closing)
+            _PROCESSOR_CACHE[remote_path] = entry
+            while len(_PROCESSOR_CACHE) > _PROCESSOR_CACHE_SIZE:
+                _evict_processor(_PROCESSOR_CACHE.popitem(last=False)[1], closing)
+    
+    _close_processors(closing)
+    
+    try:
+        with entry.lock:
+            yield entry.processor
+    finally:
+        with _processor_cache_lock:
+            entry.users -= 1
+            release = entry.evicted and entry.users == 0
+        if release:
+            entry.processor.close()
+
+
+def get_data_cache_key(fetch_date, domain_code, parameter_code, timestep, binary=False, coords=True):
+    """Cache key of a get_data response (shared with the prewarm task)"""
+    key = f"wrf_data_z_{fetch_date.isoformat()}_{domain_code}_{parameter_code}_{timestep}"
+    if binary:
+        key += "_bin"
+    if not coords:
+        key += "_nc"
+    return key
+
+
+def _wants_coords(request):
+    """False when the client passed coords=0 - it already holds the domain grid"""
+    return request.query_params.get('coords', '1').lower() not in ('0', 'false', 'no')
+
+
+def cache_get_data_response(cache_key, data, timeout=GET_DATA_CACHE_TIMEOUT):
+    """
+    Encode a get_data payload and cache it compressed
+    
+    Returns:
+        Tuple of (JSON bytes ready to send, ETag of the cached entry)
+    """
+    body, blob = _encode_get_data(data)
+    cache.set(cache_key, blob, timeout)
+    return body, _blob_etag(blob)
+
+
+def _encode_get_data(data):
+    """get_data payload as (JSON bytes, zlib-compressed cache entry)"""
+    body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return body, zlib.compress(body, 1)
+
+
+def _blob_etag(blob, deflate=False):
+    """
+    ETag of a cached get_data entry (hash of the compressed bytes - no inflate needed)
+    
+    Strong validators must be byte-exact, so the deflate-coded body gets its
+    own tag (suffixed '-deflate') rather than sharing the identity body's.
+    """
+    tag = hashlib.blake2b(blob, digest_size=16).hexdigest()
+    return quote_etag(f"{tag}-deflate" if deflate else tag)
+
+
+def _get_data_response(body, etag):
+    """JSON response for get_data with validators and client caching headers"""
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=GET_DATA_CACHE_TIMEOUT)
+    return response
+
+
+def _coding_qvalues(accept_encoding):
+    """Accept-Encoding header as {coding: q}"""
+    qvalues = {}
+    for item in accept_encoding.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    return qvalues
+
+
+def _accepts_deflate(request):
+    """True when the client accepts the deflate coding (q > 0, explicitly or via *)"""
+    qvalues = _coding_qvalues(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    return qvalues.get('deflate', qvalues.get('*', 0.0)) > 0
+
+
+def _cached_get_data_response(blob, etag, deflate):
+    """
+    Response for a cached get_data entry
+    
+    The entry is zlib data, which is exactly HTTP's 'deflate' coding: clients
+    that accept it get the stored bytes as-is (no inflate here, ~5x fewer bytes
+    on the wire); others get the inflated JSON. etag must match the coding
+    (see _blob_etag).
+    """
+    if deflate:
+        response = _get_data_response(blob, etag)
+        response['Content-Encoding'] = 'deflate'
+    else:
+        response = _get_data_response(zlib.decompress(blob), etag)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _client_cacheable(response):
+    """Let clients reuse a catalog response for CATALOG_MAX_AGE seconds"""
+    patch_cache_control(response, public=True, max_age=CATALOG_MAX_AGE)
+    return response
+
+
+@require_GET
 def ping(request):
-    """Health check endpoint"""
-    return Response({
+    """Health check endpoint (plain Django view - no DRF auth/negotiation/rendering)"""
+    return JsonResponse({
         "status": "ok",
         "message": "KMD Weather Backend is running (On-Demand Mode)",
         "timestamp": timezone.now().isoformat(),
@@ -46,6 +344,13 @@ class DomainViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Domain.objects.filter(is_active=True)
     serializer_class = DomainSerializer
     permission_classes = [AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        """Paginate the cached serialized catalog instead of querying"""
+        catalog = _active_catalog()
+        return _catalog_response(request, catalog, lambda: self.get_paginated_response(
+            self.paginate_queryset(catalog['domains'])
+        ))
 
 
 class ParameterViewSet(viewsets.ReadOnlyModelViewSet):
@@ -53,6 +358,13 @@ class ParameterViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Parameter.objects.filter(is_active=True)
     serializer_class = ParameterSerializer
     permission_classes = [AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        """Paginate the cached serialized catalog instead of querying"""
+        catalog = _active_catalog()
+        return _catalog_response(request, catalog, lambda: self.get_paginated_response(
+            self.paginate_queryset(catalog['parameters'])
+        ))
 
 
 class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
@@ -61,6 +373,10 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ForecastRunListSerializer
     permission_classes = [AllowAny]
     
+    def get_queryset(self):
+        """Load only the serialized columns (skips the files_downloaded JSON and error text)"""
+        return super().get_queryset().only(*ForecastRunListSerializer.Meta.fields)
+    
     @action(detail=False, methods=['get'])
     def latest(self, request):
         """Get metadata about the latest available forecast"""
@@ -69,20 +385,95 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
         run_time = datetime.strptime(settings.WRF_CONFIG['BASE_TIME'], '%H:%M').time()
         
         # Return available metadata
-        domains = Domain.objects.filter(is_active=True)
-        parameters = Parameter.objects.filter(is_active=True)
-        
-        response_data = {
-            'run_date': today.isoformat(),
-            'run_time': run_time.isoformat(),
-            'domains': DomainSerializer(domains, many=True).data,
-            'parameters': ParameterSerializer(parameters, many=True).data,
-            'available_timesteps': list(range(25)),  # 0-72 hours at 3-hour intervals
-            'mode': 'on-demand',
-            'note': 'Data is fetched and processed on-demand for each request'
-        }
+        catalog = _active_catalog()
+        
+        def build():
+            response_data = {
+                'run_date': today.isoformat(),
+                'run_time': run_time.isoformat(),
+                'domains': catalog['domains'],
+                'parameters': catalog['parameters'],
+                'available_timesteps': list(range(25)),  # 0-72 hours at 3-hour intervals
+                'mode': 'on-demand',
+                'note': 'Data is fetched and processed on-demand for each request'
+            }
+            # Always JSON - skip DRF content negotiation and rendering
+            return JsonResponse(response_data)
+        
+        return _catalog_response(request, catalog, build, today, run_time)
+    
+    @action(detail=False, methods=['post'])
+    def fetch(self, request):
+        """
+        Queue a full fetch + processing run in Celery and return immediately
+        
+        POST /api/forecasts/fetch/  {"date": "2025-01-13", "force": false}
+        
+        Returns:
+            202 with the task id - poll /api/forecasts/fetch/<task_id>/status/
+        """
+        from .tasks import fetch_wrf_data_task
+        
+        serializer = FetchTriggerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fetch_date = serializer.validated_data.get('date') or timezone.now().date()
+        force = serializer.validated_data['force']
+        
+        run_time = datetime.strptime(settings.WRF_CONFIG['BASE_TIME'], '%H:%M').time()
+        if not force and ForecastRun.objects.filter(
+            run_date=fetch_date, run_time=run_time, status='completed'
+        ).exists():
+            return Response({
+                "message": f"Run for {fetch_date} already processed. Use force=true to re-fetch.",
+                "date": fetch_date.isoformat(),
+            })
+        
+        # Collapse repeated triggers for the same run into one task
+        dedupe_key = FETCH_DEDUPE_KEY.format(fetch_date.isoformat(), force)
+        task_id = str(uuid.uuid4())
+        if cache.add(dedupe_key, task_id, FETCH_DEDUPE_TIMEOUT):
+            try:
+                fetch_wrf_data_task.apply_async(args=[fetch_date.isoformat()], task_id=task_id)
+            except Exception as e:
+                cache.delete(dedupe_key)
+                logger.error(f"❌ Could not queue fetch task: {e}", exc_info=True)
+                return Response({
+                    "error": "Task queue unavailable",
+                    "details": str(e)
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            logger.info(f"📤 Queued fetch for {fetch_date} (task {task_id})")
+        else:
+            task_id = cache.get(dedupe_key) or task_id
+        
+        return Response({
+            "task_id": task_id,
+            "date": fetch_date.isoformat(),
+            "status_url": f"/api/forecasts/fetch/{task_id}/status/",
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'fetch/(?P<task_id>[^/.]+)/status')
+    def fetch_status(self, request, task_id=None):
+        """State of a fetch task queued by fetch()"""
+        from celery.backends.base import DisabledBackend
+        from celery.result import AsyncResult
+        from config.celery import app
+        
+        result = AsyncResult(task_id, app=app)
+        if isinstance(result.backend, DisabledBackend):
+            return Response({
+                "task_id": task_id,
+                "error": "Task status unavailable",
+                "details": "CELERY_RESULT_BACKEND is not configured",
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         
-        return Response(response_data)
+        data = {'task_id': task_id, 'state': result.state}
+        
+        if isinstance(result.info, dict):
+            data.update(result.info)  # PROGRESS meta or the task's result
+        elif result.failed():
+            data['error'] = str(result.info)
+        
+        return Response(data)
     
     @action(detail=False, methods=['get'])
     def get_data(self, request):
@@ -97,6 +488,8 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
             - domain: kenya or east-africa
             - parameter: rainfall, temp-max, temp-min, rh, cape
             - timestep: 0-24 (0-72 hours in 3-hour intervals)
+            - encoding: 'binary' for base64 float32/uint8 buffers instead of nested lists
+            - coords: 0 to omit the grid coordinates (match on grid_id instead)
         
         Returns:
             Color-mapped grid data ready for visualization
@@ -106,12 +499,14 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
         domain_code = request.query_params.get('domain')
         parameter_code = request.query_params.get('parameter')
         timestep = request.query_params.get('timestep')
+        binary = request.query_params.get('encoding') == 'binary'
+        coords = _wants_coords(request)
         
         if not all([domain_code, parameter_code, timestep is not None]):
             return Response({
                 "error": "Missing required parameters",
                 "required": ["domain", "parameter", "timestep"],
-                "optional": ["date"]
+                "optional": ["date", "encoding", "coords"]
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
@@ -140,13 +535,20 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
         
         # Generate cache key
-        cache_key = f"wrf_data_{date_str}_{domain_code}_{parameter_code}_{timestep}"
+        cache_key = get_data_cache_key(fetch_date, domain_code, parameter_code, timestep, binary, coords)
         
         # Check cache first (15 minute TTL)
         cached_data = cache.get(cache_key)
         if cached_data:
             logger.info(f"✓ Cache hit: {cache_key}")
-            return Response(cached_data)
+            deflate = _accepts_deflate(request)
+            etag = _blob_etag(cached_data, deflate)
+            # Client already has this entry - 304 without inflating it
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                not_modified['ETag'] = etag
+                return not_modified
+            return _cached_get_data_response(cached_data, etag, deflate)
         
         logger.info(f"📊 Processing request: {fetch_date} | {domain_code} | {parameter_code} | T+{timestep*3}h")
         
@@ -156,7 +558,9 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
                 fetch_date=fetch_date,
                 domain=domain,
                 parameter=parameter,
-                timestep=timestep
+                timestep=timestep,
+                binary=binary,
+                include_coords=coords
             )
             
             if not data:
@@ -165,11 +569,12 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
                     "details": "Check server logs for more information"
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-            # Cache the result (15 minutes)
-            cache.set(cache_key, data, 900)
+            # Encode once: the same bytes are cached and sent (DRF's renderer
+            # would walk the grid lists a second time)
+            body, etag = cache_get_data_response(cache_key, data)
             
             logger.info(f"✓ Successfully processed and cached: {cache_key}")
-            return Response(data)
+            return _get_data_response(body, etag)
             
         except Exception as e:
             logger.error(f"❌ Error processing data: {e}", exc_info=True)
@@ -178,138 +583,206 @@ class ForecastRunViewSet(viewsets.ReadOnlyModelViewSet):
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    def _fetch_and_process(self, fetch_date, domain, parameter, timestep):
+    @action(detail=False, methods=['get'])
+    def bundle(self, request):
+        """
+        get_data for every active domain/parameter at one timestep, in one call
+        
+        GET /api/forecasts/bundle/?date=2025-01-13&timestep=0
+        
+        Query params:
+            - date: YYYY-MM-DD (default: today)
+            - timestep: 0-24 (default: 0)
+            - encoding: 'list' for nested lists (default: binary buffers)
+            - coords: 0 to omit the grid coordinates
+        
+        Returns:
+            {"<domain>/<parameter>": <get_data payload>, ..., "missing": [...]}
+        """
+        try:
+            fetch_date = datetime.fromisoformat(
+                request.query_params.get('date', timezone.now().date().isoformat())
+            ).date()
+            timestep = int(request.query_params.get('timestep', 0))
+            if timestep < 0 or timestep > 24:
+                raise ValueError("Timestep must be between 0 and 24")
+        except ValueError as e:
+            return Response({
+                "error": f"Invalid parameter: {str(e)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        binary = request.query_params.get('encoding') != 'list'
+        coords = _wants_coords(request)
+        
+        domains = list(Domain.objects.filter(is_active=True))
+        parameters = list(Parameter.objects.filter(is_active=True))
+        pairs = {
+            get_data_cache_key(fetch_date, d.code, p.code, timestep, binary, coords): (d, p)
+            for d in domains for p in parameters
+        }
+        
+        # One round-trip for everything already cached
+        blobs = cache.get_many(list(pairs))
+        bodies = {key: zlib.decompress(blob) for key, blob in blobs.items()}
+        
+        new_entries, missing = {}, []
+        for key, (domain, parameter) in pairs.items():
+            if key in bodies:
+                continue
+            try:
+                data = self._fetch_and_process(
+                    fetch_date, domain, parameter, timestep, binary=binary, include_coords=coords
+                )
+                bodies[key], new_entries[key] = _encode_get_data(data)
+            except Exception as e:
+                logger.warning(f"⚠️  Bundle entry {key} failed: {e}")
+                missing.append(f"{domain.code}/{parameter.code}")
+        
+        if new_entries:
+            cache.set_many(new_entries, GET_DATA_CACHE_TIMEOUT)
+        
+        logger.info(f"📦 Bundle {fetch_date} T+{timestep*3}h: {len(blobs)} cached, "
+                    f"{len(new_entries)} processed, {len(missing)} missing")
+        
+        # Splice the already-encoded payloads instead of re-parsing them
+        parts = [
+            json.dumps(f"{d.code}/{p.code}").encode('utf-8') + b':' + bodies[key]
+            for key, (d, p) in pairs.items() if key in bodies
+        ]
+        parts.append(b'"missing":' + json.dumps(missing).encode('utf-8'))
+        return HttpResponse(b'{' + b','.join(parts) + b'}', content_type='application/json')
+    
+    def _fetch_and_process(self, fetch_date, domain, parameter, timestep, binary=False,
+                           include_coords=True):
         """
         Fetch GRIB file, process it, and return data
-        Uses temporary storage - files are deleted after processing
+        The GRIB is streamed into memory - nothing is staged on local disk
+        
+        With binary=True the grid goes out as base64 typed-array buffers
+        (float32 coords, uint8 palette indices, int16 packed values) instead
+        of nested JSON lists. include_coords=False leaves the coordinates out;
+        grid_id identifies the grid so clients can reuse the ones they hold.
         """
-        from .utils.ssh_fetcher import create_fetcher_from_config
-        from .utils.grib_processor import GRIBProcessor
+        from .utils.ssh_fetcher import shared_fetcher
         from .utils.color_mapper import get_mapper_for_parameter
         
-        temp_dir = None
+        # Calculate run datetime
+        run_time = datetime.strptime(settings.WRF_CONFIG['BASE_TIME'], '%H:%M').time()
+        run_datetime = datetime.combine(fetch_date, run_time)
         
-        try:
-            # Create temporary directory
-            temp_dir = tempfile.mkdtemp(prefix='wrf_temp_')
-            logger.info(f"📁 Created temp directory: {temp_dir}")
-            
-            # Calculate run datetime
-            run_time = datetime.strptime(settings.WRF_CONFIG['BASE_TIME'], '%H:%M').time()
-            run_datetime = datetime.combine(fetch_date, run_time)
-            
-            # Calculate which GRIB file we need
-            forecast_hour = timestep * 3
-            grib_filename = f'WRFPRS_d{domain.file_suffix}.{forecast_hour:02d}'
-            
-            # Connect and download specific file
+        # Calculate which GRIB file we need
+        forecast_hour = timestep * 3
+        grib_filename = f'WRFPRS_d{domain.file_suffix}.{forecast_hour:02d}'
+        
+        def load(remote_path):
+            # Stream specific file over the persistent connection
             logger.info(f"📥 Fetching: {grib_filename}")
-            fetcher = create_fetcher_from_config(settings.WRF_CONFIG)
-            
-            if not fetcher.connect():
-                raise ConnectionError("Failed to connect to WRF server")
-            
-            try:
-                # Get remote path
-                folder_name = fetcher.get_forecast_folder_name(run_datetime)
-                remote_path = f"{fetcher.remote_archive_path}/{folder_name}/{grib_filename}"
-                local_path = os.path.join(temp_dir, grib_filename)
-                
-                # Download file
-                success = fetcher.download_file(remote_path, local_path)
-                
-                if not success:
-                    raise FileNotFoundError(f"Failed to download {grib_filename}")
-                
-                logger.info(f"✓ Downloaded to {local_path}")
-                
-            finally:
-                fetcher.disconnect()
-            
-            # Process GRIB file
-            logger.info(f"⚙️  Processing {grib_filename}")
-            
-            with GRIBProcessor(local_path) as processor:
-                extracted_data = processor.extract_parameter(
-                    parameter.code,
-                    apply_color_mapping=False
-                )
+            with shared_fetcher(settings.WRF_CONFIG) as fetcher:
+                try:
+                    return fetcher.fetch_bytes(remote_path)
+                except IOError as e:
+                    raise FileNotFoundError(f"Failed to download {grib_filename}: {e}")
+        
+        with shared_fetcher(settings.WRF_CONFIG) as fetcher:
+            folder_name = fetcher.get_forecast_folder_name(run_datetime)
+            remote_path = f"{fetcher.remote_archive_path}/{folder_name}/{grib_filename}"
+        
+        # Process GRIB file (opened once, shared with other parameters of this file)
+        logger.info(f"⚙️  Processing {grib_filename}")
+        
+        with _cached_processor(remote_path, load) as processor:
+            extracted = processor.read_arrays(parameter.code, include_coords=False)
             
-            if not extracted_data:
+            if extracted is None:
                 raise ValueError(f"No data extracted for {parameter.code}")
             
-            # Get arrays
-            lats = np.array(extracted_data['lats'])
-            lons = np.array(extracted_data['lons'])
-            values = np.array(extracted_data['values'])
-            
-            # For cumulative parameters, we'd need to process all previous timesteps
-            # For demo purposes, we'll just return the current timestep
-            # TODO: Implement proper cumulative calculation if needed
-            
-            # Apply color mapping
-            mapper = get_mapper_for_parameter(parameter.code)
-            color_data = mapper.map_grid(values)
-            
-            # Calculate statistics
-            valid_values = values[~np.isnan(values)]
-            min_val = float(np.min(valid_values)) if len(valid_values) > 0 else None
-            max_val = float(np.max(valid_values)) if len(valid_values) > 0 else None
-            
-            # Calculate valid time
-            valid_time = timezone.make_aware(run_datetime + timedelta(hours=forecast_hour))
-            
-            # Prepare response
-            result = {
-                'domain': domain.code,
-                'parameter': parameter.code,
-                'parameter_name': parameter.name,
-                'unit': parameter.unit,
-                'time_step': timestep,
-                'valid_time': valid_time.isoformat(),
-                'grid_lats': lats.tolist(),
-                'grid_lons': lons.tolist(),
-                'color_data': color_data,
-                'min_value': min_val,
-                'max_value': max_val,
-                'color_scale': parameter.color_scale,
+            values = extracted[0]
+            bbox = (domain.min_lat, domain.max_lat, domain.min_lon, domain.max_lon)
+            coords_key = (domain.code, values.shape, bbox, binary)
+            window, coords = _cached_coords(
+                coords_key, lambda: processor.read_arrays(parameter.code)
+            )
+        
+        # Only the domain's bounding box is mapped, cached and sent
+        full_shape = values.shape
+        values = values[window]
+        
+        # For cumulative parameters, we'd need to process all previous timesteps
+        # For demo purposes, we'll just return the current timestep
+        # TODO: Implement proper cumulative calculation if needed
+        
+        # Apply color mapping
+        mapper = get_mapper_for_parameter(parameter.code)
+        if binary:
+            indices = mapper.map_grid_indices(values)
+            color_payload = {
+                'color_indices_b64': base64.b64encode(indices.tobytes()).decode('ascii'),
+                'palette': mapper.palette(),
+                # Values as int16 with the parameter's storage scale/offset:
+                # value = q * pack_scale + pack_offset, pack_nan for missing
+                'values_i16_b64': base64.b64encode(parameter.pack_values(values)).decode('ascii'),
+                'pack_scale': parameter.pack_scale,
+                'pack_offset': parameter.pack_offset,
+                'pack_nan': PACKED_NAN,
             }
-            
-            return result
-            
-        finally:
-            # CRITICAL: Clean up temporary files
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                    logger.info(f"🗑️  Cleaned up temp directory: {temp_dir}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup temp dir: {e}")
+        else:
+            color_payload = {'color_data': mapper.map_grid(values)}
+        
+        # Statistics were already reduced by read_arrays (None for all-NaN grids);
+        # redo them only when the bbox cropped the grid
+        stats = extracted[3]
+        min_val = stats['min']
+        max_val = stats['max']
+        if values.shape != full_shape and max_val is not None:
+            max_val = float(np.nanmax(values))
+            if np.isnan(max_val):  # nothing valid inside the box
+                min_val = max_val = None
+            else:
+                min_val = float(np.nanmin(values))
+        
+        # Calculate valid time
+        valid_time = timezone.make_aware(run_datetime + timedelta(hours=forecast_hour))
+        
+        # Prepare response
+        result = {
+            'domain': domain.code,
+            'parameter': parameter.code,
+            'parameter_name': parameter.name,
+            'unit': parameter.unit,
+            'time_step': timestep,
+            'valid_time': valid_time.isoformat(),
+            'min_value': min_val,
+            'max_value': max_val,
+            'color_scale': parameter.color_scale,
+            'grid_id': f"{domain.code}:{values.shape[0]}x{values.shape[1]}",
+            'grid_shape': list(values.shape),
+        }
+        if include_coords and binary:
+            result.update(coords)
+        elif include_coords:
+            result['grid_lats'] = coords['lats']
+            result['grid_lons'] = coords['lons']
+        result.update(color_payload)
+        
+        return result
 
 
-class ForecastDataViewSet(viewsets.ReadOnlyModelViewSet):
+@csrf_exempt
+def forecast_data_deprecated(request, pk=None):
     """
     DEPRECATED - Use ForecastRunViewSet.get_data() instead
-    This viewset is kept for backwards compatibility
+    Kept for backwards compatibility as a plain view (no viewset machinery);
+    every method, on the list and detail routes, gets the 410 notice
     """
-    queryset = ForecastData.objects.none()
-    serializer_class = ForecastDataGridSerializer
-    permission_classes = [AllowAny]
-    
-    def list(self, request):
-        return Response({
-            "message": "This endpoint is deprecated. Use /api/forecasts/get_data/ instead",
-            "example": "/api/forecasts/get_data/?date=2025-01-13&domain=kenya&parameter=rainfall&timestep=0"
-        }, status=status.HTTP_410_GONE)
+    return JsonResponse({
+        "message": "This endpoint is deprecated. Use /api/forecasts/get_data/ instead",
+        "example": "/api/forecasts/get_data/?date=2025-01-13&domain=kenya&parameter=rainfall&timestep=0"
+    }, status=410)
 
 
-class DataFetchLogViewSet(viewsets.ReadOnlyModelViewSet):
+@require_GET
+def fetch_logs(request, pk=None):
     """Minimal logging - not critical for on-demand mode"""
-    queryset = DataFetchLog.objects.all().order_by('-started_at')[:10]
-    permission_classes = [AllowAny]
-    
-    def list(self, request):
-        return Response({
-            "message": "Fetch logs are not maintained in on-demand mode",
-            "note": "Data is fetched and processed in real-time for each request"
-        })
\ No newline at end of file
+    return JsonResponse({
+        "message": "Fetch logs are not maintained in on-demand mode",
+        "note": "Data is fetched and processed in real-time for each request"
+    })